@@ -0,0 +1,106 @@
+import json  # 检查点文件使用JSON行格式
+import os  # 原子替换和fsync
+import time  # 控制写检查点的间隔
+
+from frontier import frontier_from_levels  # 恢复时重建每层的配置
+
+
+""" heesch_computer 的检查点
+
+检查点是一个目录,包含三个文件(l为当前层数):
+    1) state.json: 形状和计算选项, 当前层数, 已扩展的配置数和next-l.jsonl的有效长度,每次都整体原子替换
+    2) frontier-l.jsonl: 当前层的所有配置,每层开始时原子写入一次
+    3) next-l.jsonl: 已扩展配置得到的下一层配置,只追加写入,恢复时截断到state.json记录的长度
+state.json更新到新的一层之后才删除上一层的文件,所以任何时候被杀掉都能恢复到一致的状态。
+配置中的每个形状记为(方向编号, dx, dy),方向编号对应 shape.orientations() 的顺序(见 lattice.HeeschSearch),
+所以每个形状只占三个整数,与 frontier.Frontier 中的摆放相同。 """
+
+
+class Checkpoint:
+    def __init__(self, path, form, orientations, symmetry=False, dynamic=False, engine="search", interval=60):  # form是形状的 lattice.Polyform
+        self.path = path  # 检查点目录
+        self.orientations = orientations
+        self.interval = interval  # 两次写state.json之间至少间隔的秒数
+        # 恢复时用来确认是同一个任务: 形状和所有影响各层配置(及其顺序)的选项,
+        # 优先级决定第1层外部格子的顺序,engine决定每层冠状结构的顺序
+        self.key = {"base": form.to_data(), "priority": [list(cell) for cell in form.priority],
+                    "symmetry": symmetry, "dynamic": dynamic, "engine": engine}
+        self.level = 0
+        self.done = 0  # 当前层已扩展的配置数
+        self.next_file = None
+        self.last_save = time.time()
+        os.makedirs(path, exist_ok=True)
+
+    def file(self, name):
+        return os.path.join(self.path, name)
+
+    def decode_corona(self, data):  # 扁平的整数列表 -> 摆放元组
+        return tuple((data[k], data[k+1], data[k+2]) for k in range(0, len(data), 3))
+
+    def write_atomic(self, name, lines):  # 先写临时文件再替换,中途被杀掉也不会留下半个文件
+        tmp = self.file(name + ".tmp")
+        with open(tmp, "w") as file:
+            for line in lines:
+                file.write(line + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp, self.file(name))
+
+    def save_state(self):  # 把已追加的结果落盘后更新state.json
+        offset = 0
+        if self.next_file is not None:
+            self.next_file.flush()
+            os.fsync(self.next_file.fileno())
+            offset = self.next_file.tell()
+        state = dict(self.key, level=self.level, done=self.done, offset=offset)
+        self.write_atomic("state.json", [json.dumps(state)])
+        self.last_save = time.time()
+
+    def load(self):  # 读取检查点,返回(层数, 当前层的Frontier, 已扩展数, 下一层的Frontier),没有检查点返回None
+        if not os.path.exists(self.file("state.json")):
+            return None
+        with open(self.file("state.json")) as file:
+            state = json.load(file)
+        if {key: state.get(key) for key in self.key} != json.loads(json.dumps(self.key)):  # 旧的检查点缺少的选项也算不同
+            raise ValueError(f"checkpoint in {self.path} belongs to a different shape or different options")
+        configs = []
+        level = state["level"]
+        with open(self.file(f"frontier-{level}.jsonl")) as file:
+            for line in file:
+                configs.append([self.decode_corona(corona) for corona in json.loads(line)])
+        frontier = frontier_from_levels(self.orientations, configs)
+        next_frontier = frontier.child()
+        os.truncate(self.file(f"next-{level}.jsonl"), state["offset"])  # 丢掉上次检查点之后写入的部分
+        with open(self.file(f"next-{level}.jsonl")) as file:
+            for line in file:
+                parent, corona = json.loads(line)
+                next_frontier.append(parent, self.decode_corona(corona))
+        self.next_file = open(self.file(f"next-{level}.jsonl"), "a")
+        self.level, self.done = level, state["done"]
+        return self.level, frontier, self.done, next_frontier
+
+    def start_level(self, level, frontier):  # 开始新的一层: 写入当前层的配置,清空下一层
+        old_level = self.level if self.next_file is not None else None
+        lines = (json.dumps([[n for placement in corona for n in placement] for corona in frontier.levels(i)],
+                            separators=(",", ":")) for i in range(len(frontier)))
+        self.write_atomic(f"frontier-{level}.jsonl", lines)
+        if self.next_file is not None:
+            self.next_file.close()
+        self.next_file = open(self.file(f"next-{level}.jsonl"), "w")
+        self.level, self.done = level, 0
+        self.save_state()
+        if old_level is not None and old_level != level:  # 新的一层已经记录好,删除上一层的文件
+            os.remove(self.file(f"frontier-{old_level}.jsonl"))
+            os.remove(self.file(f"next-{old_level}.jsonl"))
+
+    def record(self, i, placements):  # 第i个配置扩展完成,placements是新一层冠状结构的摆放元组
+        for config in placements:
+            self.next_file.write(json.dumps([i, [n for placement in config for n in placement]], separators=(",", ":")) + "\n")
+        self.done = i + 1
+        if time.time() - self.last_save >= self.interval:
+            self.save_state()
+
+    def close(self):  # 计算结束时保存最后的状态
+        self.save_state()
+        self.next_file.close()
+        self.next_file = None
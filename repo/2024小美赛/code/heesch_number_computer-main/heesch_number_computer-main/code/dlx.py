@@ -0,0 +1,161 @@
+""" 用Dancing Links(Knuth的X算法)生成冠状结构
+
+围一层就是一个带可选列的精确覆盖问题:
+    1) 主列: 形状外部的每个格子,必须恰好被一个摆放覆盖
+    2) 次列: 其它格子,至多被一个摆放覆盖(摆放之间不重叠)
+    3) 次列: 边匹配。对相邻格子lo < hi之间的边,列(lo, hi, t)表示"hi一侧的边类型是t",
+       hi一侧类型为b的摆放占据(lo, hi, b),lo一侧类型为a的摆放占据所有t != -a的列,
+       所以类型不相反的两个摆放会在同一列上冲突
+与中心形状重叠或边不匹配的摆放在建表时就去掉。得到的是外部格子的所有精确覆盖,
+与 lattice.corona_placements 的结果相同,只是顺序不同。网格和形状的表示见lattice.py。 """
+
+
+class DancingLinks:
+    """ 精确覆盖的双向十字链表,用列表存储节点,cover和uncover都是O(1)的链表操作 """
+
+    def __init__(self, primary, secondary, rows):  # rows中每一行是列的键的列表
+        columns = list(primary) + list(secondary)
+        index = {key: k + 1 for k, key in enumerate(columns)}  # 列的键 -> 列头节点,0是根节点
+        n = len(columns) + 1
+        self.L = list(range(-1, n - 1))
+        self.R = list(range(1, n + 1))
+        self.L[0], self.R[len(primary)] = len(primary), 0  # 只有主列连在根节点的环上
+        for c in range(len(primary) + 1, n):  # 次列自成一环,永远不会被选中
+            self.L[c] = self.R[c] = c
+        self.U = list(range(n))
+        self.D = list(range(n))
+        self.C = list(range(n))  # 节点所在的列
+        self.S = [0] * n  # 每列的节点数
+        self.row = [None] * n  # 节点所在的行
+        for r, keys in enumerate(rows):
+            first = None
+            for key in keys:
+                c = index[key]
+                node = len(self.C)
+                self.C.append(c)
+                self.row.append(r)
+                self.U.append(self.U[c])  # 插在列的最下面
+                self.D.append(c)
+                self.D[self.U[c]] = node
+                self.U[c] = node
+                self.S[c] += 1
+                if first is None:
+                    first = node
+                    self.L.append(node)
+                    self.R.append(node)
+                else:  # 插在行的最右边
+                    self.L.append(self.L[first])
+                    self.R.append(first)
+                    self.R[self.L[first]] = node
+                    self.L[first] = node
+
+    def solutions(self):  # 逐个生成精确覆盖,每个是行号的列表
+        L, R, U, D, C, S, row = self.L, self.R, self.U, self.D, self.C, self.S, self.row
+        chosen = []
+
+        def cover(c):  # 把列c和与它冲突的行从表中摘下
+            R[L[c]] = R[c]
+            L[R[c]] = L[c]
+            i = D[c]
+            while i != c:
+                j = R[i]
+                while j != i:
+                    D[U[j]] = D[j]
+                    U[D[j]] = U[j]
+                    S[C[j]] -= 1
+                    j = R[j]
+                i = D[i]
+
+        def uncover(c):  # cover的逆操作,按相反的顺序恢复
+            i = U[c]
+            while i != c:
+                j = L[i]
+                while j != i:
+                    S[C[j]] += 1
+                    D[U[j]] = j
+                    U[D[j]] = j
+                    j = L[j]
+                i = U[i]
+            R[L[c]] = c
+            L[R[c]] = c
+
+        def search():
+            if R[0] == 0:  # 所有主列都被覆盖
+                yield list(chosen)
+                return
+            c = best = R[0]
+            while c != 0:  # 选节点最少的主列
+                if S[c] < S[best]:
+                    best = c
+                c = R[c]
+            if S[best] == 0:  # 有格子无法覆盖
+                return
+            cover(best)
+            r = D[best]
+            while r != best:
+                chosen.append(row[r])
+                j = R[r]
+                while j != r:
+                    cover(C[j])
+                    j = R[j]
+                yield from search()
+                j = L[r]
+                while j != r:
+                    uncover(C[j])
+                    j = L[j]
+                chosen.pop()
+                r = D[r]
+            uncover(best)
+
+        return search()
+
+
+def corona_rows(grid, cells, tiles, outside):  # 建立精确覆盖的行: 返回(主列, 次列, 行, 每行的摆放)
+    """ cells是中心形状(格子 -> edgedata),tiles是所有方向的(格子, edgedata)列表,outside是外部格子 """
+    types = {mark for tile in tiles for cell, marks in tile for mark in marks}
+    marked = any(types)  # 没有边类型时不需要边匹配的列
+    types |= {-mark for mark in types}
+    rows, keys, seen = [], [], set()
+    secondary = set()
+    for target in outside:
+        for index, tile in enumerate(tiles):
+            for tile_cell, marks in tile:
+                if tile_cell[2:] != target[2:]:  # 只有种类相同的格子之间才能平移
+                    continue
+                dx, dy = target[0] - tile_cell[0], target[1] - tile_cell[1]
+                if (index, dx, dy) in seen:
+                    continue
+                seen.add((index, dx, dy))
+                placed = {grid.translate(cell, dx, dy): marks for cell, marks in tile}
+                if any(cell in cells for cell in placed):  # 与中心形状重叠
+                    continue
+                columns = list(placed)
+                fits = True
+                for cell, marks in placed.items():
+                    for slot, other, other_slot in grid.neighbours(cell):
+                        if other in placed or not marked:
+                            continue
+                        if other in cells:
+                            if marks[slot] != -cells[other][other_slot]:  # 与中心形状的边不匹配
+                                fits = False
+                            continue
+                        lo, hi = min(cell, other), max(cell, other)
+                        if cell == hi:
+                            columns.append((lo, hi, marks[slot]))
+                        else:
+                            columns.extend((lo, hi, t) for t in types if t != -marks[slot])
+                if fits:
+                    rows.append(columns)
+                    keys.append((index, dx, dy))
+                    secondary.update(columns)
+    secondary -= set(outside)
+    return outside, sorted(secondary, key=repr), rows, keys
+
+
+def dlx_placements(grid, cells, tiles, outside=None):  # 逐个生成冠状结构,每个是摆放(方向编号, dx, dy)的元组
+    """ 与 lattice.corona_placements 的参数相同,outside默认为 grid.outside(cells) """
+    if outside is None:
+        outside = grid.outside(cells)
+    primary, secondary, rows, keys = corona_rows(grid, cells, tiles, outside)
+    for solution in DancingLinks(primary, secondary, rows).solutions():
+        yield tuple(keys[r] for r in sorted(solution))
@@ -0,0 +1,77 @@
+from array import array  # 紧凑的整数数组
+
+
+""" heesch_computer 每一层的配置
+
+配置(中心形状外的k层冠状结构)不再存成形状列表的列表,而是按层存成一棵树:
+第k层的一个配置 = 第k-1层中的父配置编号 + 第k层冠状结构的摆放(方向编号, dx, dy),
+同一个父配置的所有子配置共享前面各层。每层的数据扁平地放在三个int数组里:
+    parents[i]: 第i个配置的父配置编号(第1层为-1)
+    starts[i]: 第i个配置的摆放在data中的起点(starts[i+1]是终点)
+    data: 所有摆放的方向编号, dx, dy依次排列
+所以一个配置只占几十个字节,形状只在输出时才重建。 """
+
+
+class Frontier:
+    def __init__(self, orientations, parent=None):
+        self.orientations = orientations  # 方向编号 -> 形状
+        self.parent = parent  # 上一层的Frontier,第1层为None
+        self.level = 1 if parent is None else parent.level + 1  # 第几层
+        self.parents = array("i")
+        self.starts = array("i", [0])
+        self.data = array("i")
+
+    def __len__(self):
+        return len(self.parents)
+
+    def child(self):  # 下一层的空Frontier
+        return Frontier(self.orientations, self)
+
+    def append(self, parent, placements):  # 加入一个配置: 父配置编号和这一层的摆放元组
+        self.parents.append(parent)
+        for placement in placements:
+            self.data.extend(placement)
+        self.starts.append(len(self.data))
+
+    def placements(self, i):  # 第i个配置在这一层的摆放元组
+        data, start, end = self.data, self.starts[i], self.starts[i + 1]
+        return tuple((data[k], data[k + 1], data[k + 2]) for k in range(start, end, 3))
+
+    def levels(self, i):  # 第i个配置从第1层到这一层的摆放元组的列表
+        res = []
+        frontier = self
+        while frontier is not None:
+            res.append(frontier.placements(i))
+            i = frontier.parents[i]
+            frontier = frontier.parent
+        res.reverse()
+        return res
+
+    def config(self, i):  # 重建第i个配置: 每层一个形状列表
+        return [[self.orientations[index].translate(dx, dy) for index, dx, dy in corona] for corona in self.levels(i)]
+
+    def configs(self):  # 重建所有配置,格式与原来的coronalist相同
+        return [self.config(i) for i in range(len(self))]
+
+    def select(self, indices):  # 只保留indices中的配置(保持顺序),共享同一个父层
+        res = Frontier(self.orientations, self.parent)
+        for i in indices:
+            res.append(self.parents[i], self.placements(i))
+        return res
+
+
+def frontier_from_levels(orientations, configs):  # 由每个配置各层的摆放元组建立Frontier,最后一层的第k个就是configs[k]
+    """ 前面各层相同的前缀只存一次 """
+    depth = len(configs[0]) if configs else 1
+    frontier = None
+    nodes = [-1] * len(configs)  # 每个配置在当前层的编号
+    for level in range(depth):
+        frontier = Frontier(orientations, frontier)
+        index = {}
+        for k, config in enumerate(configs):
+            key = (nodes[k], config[level])
+            if level == depth - 1 or key not in index:
+                index[key] = len(frontier)
+                frontier.append(*key)
+            nodes[k] = index[key]
+    return frontier
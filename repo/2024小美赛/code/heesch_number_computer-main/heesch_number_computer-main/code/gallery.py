@@ -0,0 +1,187 @@
+import argparse  # 命令行参数
+import os  # 目录和文件名
+import struct  # PNG的数据块
+import time  # 计时
+import zlib  # PNG的压缩和校验
+from concurrent.futures import ProcessPoolExecutor  # 并行画图
+
+import numpy as np
+from matplotlib.colors import to_rgb  # 颜色名 -> RGB
+
+from main2 import colors, layers  # 与main2.py相同的分层和配色
+from plotfile import PlotFile  # 结果文件
+
+
+""" 批量画出一个目录里的所有结果文件(*.bin)
+
+    1) rasterize(data, size): 纯numpy的六边形光栅化,不经过matplotlib: 每个像素的中心换算成
+       六边形的轴坐标,取整到所在的六边形,再查表得到形状编号和颜色,形状的边界取编号不同的相邻像素。
+       边的标记太小,缩略图里不画
+    2) render_full(data, path, size): 在进程里用Agg画全尺寸图(main2.render),不使用pyplot
+    3) gallery(directory, out): 进程池里逐个文件画缩略图 out/thumbs/*.png 和全尺寸图 out/full/*.png
+命令行: python gallery.py results --out gallery --workers 8 --thumb 128 --full 1000 """
+
+
+""" 六边形光栅化 """
+
+
+SQRT3 = np.sqrt(3)
+BACKGROUND = np.array([255, 255, 255], dtype=np.uint8)  # 背景色
+
+
+def _rgb(name):  # 颜色名 -> uint8的RGB
+    return np.round(np.array(to_rgb(name)) * 255).astype(np.uint8)
+
+
+def _axial(x, y):  # 格子坐标 -> 轴坐标(q, r): 六边形中心(x, y) = q*(1, -1) + r*(2, 1),对非中心的点是小数
+    return (x - 2 * y) / 3, (x + y) / 3
+
+
+def _round_axial(q, r):  # 把小数轴坐标取整到所在的六边形(立方坐标取整)
+    s = -q - r
+    rq, rr, rs = np.round(q), np.round(r), np.round(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+    fix_q = (dq > dr) & (dq > ds)  # 误差最大的那个坐标由另外两个决定
+    fix_r = ~fix_q & (dr > ds)
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+    return rq.astype(np.int64), rr.astype(np.int64)
+
+
+def rasterize(data, size=128, margin=2):  # 结果文件data(PlotFile)的缩略图,(高, 宽, 3)的uint8数组,长边为size像素
+    centers, fills, edges = [], [], []  # 所有六边形的中心; 每个形状的填充色和边的颜色
+    shape_ids = []
+    for level, layer, _ in layers(data):
+        style = colors(data.type, level)
+        if style is None or layer.size == 0:
+            continue
+        n, k = layer.shape[:2]
+        centers.append(layer.reshape(-1, 2))
+        shape_ids.append(np.repeat(np.arange(len(fills), len(fills) + n), k))
+        fills.extend([_rgb(style[0])] * n)
+        edges.extend([_rgb(style[1])] * n)
+    if not centers:
+        return np.broadcast_to(BACKGROUND, (size, size, 3)).copy()
+    centers, shape_ids = np.concatenate(centers), np.concatenate(shape_ids)
+    fills, edges = np.array(fills), np.array(edges)
+
+    # 六边形编号表: 按轴坐标索引,-1为空
+    q, r = _axial(centers[:, 0], centers[:, 1])
+    q, r = q.astype(np.int64), r.astype(np.int64)
+    qmin, rmin = q.min(), r.min()
+    table = np.full((q.max() - qmin + 1, r.max() - rmin + 1), -1, dtype=np.int64)
+    table[q - qmin, r - rmin] = shape_ids
+
+    # 图像范围: 平面坐标(x - y/2, √3/2 y)下六边形中心的外接框,加上半径
+    px, py = centers[:, 0] - 0.5 * centers[:, 1], 0.5 * SQRT3 * centers[:, 1]
+    left, right, bottom, top = px.min() - 1, px.max() + 1, py.min() - 0.5 * SQRT3, py.max() + 0.5 * SQRT3
+    scale = max(right - left, top - bottom) / (size - 2 * margin)  # 每个像素的边长
+    width = int(np.ceil((right - left) / scale)) + 2 * margin
+    height = int(np.ceil((top - bottom) / scale)) + 2 * margin
+    left -= ((width * scale) - (right - left)) / 2
+    top += ((height * scale) - (top - bottom)) / 2
+
+    # 每个像素中心 -> 格子坐标 -> 所在的六边形
+    ys = top - (np.arange(height) + 0.5) * scale  # 图像的行从上往下
+    xs = left + (np.arange(width) + 0.5) * scale
+    ly = ys[:, None] * 2 / SQRT3
+    lx = xs[None, :] + ly / 2
+    hq, hr = _round_axial(*_axial(lx, ly))
+    hq, hr = hq - qmin, hr - rmin
+    inside = (hq >= 0) & (hq < table.shape[0]) & (hr >= 0) & (hr < table.shape[1])
+    ids = np.full((height, width), -1, dtype=np.int64)
+    ids[inside] = table[hq[inside], hr[inside]]
+
+    # 编号与右边或下边的像素不同的像素是形状的边界
+    border = np.zeros((height, width), dtype=bool)
+    border[:, :-1] |= ids[:, :-1] != ids[:, 1:]
+    border[:, 1:] |= ids[:, :-1] != ids[:, 1:]
+    border[:-1, :] |= ids[:-1, :] != ids[1:, :]
+    border[1:, :] |= ids[:-1, :] != ids[1:, :]
+    image = np.broadcast_to(BACKGROUND, (height, width, 3)).copy()
+    shape = ids >= 0
+    image[shape] = fills[ids[shape]]
+    image[shape & border] = edges[ids[shape & border]]
+    return image
+
+
+def write_png(path, image):  # 把(高, 宽, 3)的uint8数组写成PNG(每行不做滤波)
+    height, width = image.shape[:2]
+    raw = np.concatenate([np.zeros((height, 1), dtype=np.uint8), image.reshape(height, -1)], axis=1).tobytes()
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+    with open(path, "wb") as file:
+        file.write(b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+                   + chunk(b"IDAT", zlib.compress(raw, 6)) + chunk(b"IEND", b""))
+
+
+""" 全尺寸图 """
+
+
+def render_full(data, path, size=1000, dpi=100):  # 用Agg画出size像素见方的全尺寸图
+    from matplotlib.figure import Figure  # 不用pyplot,不需要选择后端,也没有全局状态
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from main2 import render
+
+    figure = Figure(figsize=(size / dpi, size / dpi), dpi=dpi)
+    FigureCanvasAgg(figure)
+    render(figure.add_subplot(), data)
+    figure.savefig(path, dpi=dpi)
+
+
+""" 批量处理 """
+
+
+def gallery_job(task):  # 在进程中画一个结果文件,返回(文件名, 错误信息或None, 秒数)
+    path, out, thumb, full = task
+    name = os.path.splitext(os.path.basename(path))[0]
+    start = time.time()
+    try:
+        with PlotFile(path) as data:
+            if thumb:
+                write_png(os.path.join(out, "thumbs", name + ".png"), rasterize(data, thumb))
+            if full:
+                render_full(data, os.path.join(out, "full", name + ".png"), full)
+    except (OSError, ValueError) as error:  # 不是结果文件或读写失败: 跳过这个文件
+        return name, str(error), time.time() - start
+    return name, None, time.time() - start
+
+
+def gallery(directory, out="gallery", workers=None, thumb=128, full=1000):  # 画出directory中所有的*.bin,返回失败的文件
+    paths = sorted(entry.path for entry in os.scandir(directory) if entry.is_file() and entry.name.endswith(".bin"))
+    for sub, enabled in (("thumbs", thumb), ("full", full)):
+        if enabled:
+            os.makedirs(os.path.join(out, sub), exist_ok=True)
+    tasks = [(path, out, thumb, full) for path in paths]
+    print(f" gallery: {len(tasks)} result files")
+    failed = []
+    if workers is None or workers <= 1:
+        results = map(gallery_job, tasks)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(workers)
+        results = pool.map(gallery_job, tasks, chunksize=max(1, len(tasks) // (8 * workers)))  # 小任务成批分发
+    try:
+        for i, (name, error, seconds) in enumerate(results):
+            if error is not None:
+                failed.append((name, error))
+                print(f" gallery: {i+1}/{len(tasks)} {name} skipped: {error}")
+            else:
+                print(f" gallery: {i+1}/{len(tasks)} {name} ({seconds:.2f} s)")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render every result file (*.bin) in a directory to PNG")
+    parser.add_argument("directory")
+    parser.add_argument("--out", default="gallery")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--thumb", type=int, default=128, help="thumbnail size in pixels, 0 to skip")
+    parser.add_argument("--full", type=int, default=1000, help="full image size in pixels, 0 to skip")
+    args = parser.parse_args()
+    gallery(args.directory, args.out, args.workers, args.thumb, args.full)
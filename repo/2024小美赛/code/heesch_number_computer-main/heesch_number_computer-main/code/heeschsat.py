@@ -0,0 +1,217 @@
+from lattice import MAX_LEVEL  # 默认的层数上限
+from satsolver import CDCLSolver, at_most_one  # 默认使用内置的CDCL求解器
+
+
+""" 用SAT计算Heesch数
+
+"形状能围k层冠状结构"被编码成一个布尔可满足性问题:
+    1) 对每一层l和每个可能的摆放p(某个方向平移到某处)有一个变量x[p, l]
+    2) 同一个格子至多被一个摆放占据,摆放不能和中心形状重叠
+    3) 相邻的两个摆放的边类型必须相反(edgedata中的1和-1)
+    4) 中心形状外面的每个格子都被第1层覆盖,第l层形状外面的格子被第l-1, l, l+1层覆盖,
+       外面的格子是与形状共用顶点的格子(六边形网格中就是相邻格子,三角形网格中还包括只共用顶点的)
+    5) 第l层的形状必须和第l-1层的某个形状共用顶点
+这和 lattice.corona_placements 的定义一致,所以两种方法算出的Heesch数相同。
+形状可以是 HShape、Shape 或 lattice.Polyform,网格由 shape.polyform() 给出。 """
+
+
+# 形状所在的网格: 格子的编码和相邻关系见lattice.py
+class GridLattice:
+    marked = True  # 边上有类型标记,需要做边匹配
+
+    def __init__(self, shape, orientations=None):  # orientations默认为shape的所有方向,围拼块时传入原形状的方向
+        form = shape.polyform()
+        self.grid = form.grid
+        self.orientations = shape.orientations() if orientations is None else orientations  # 所有不同的方向
+        self.tiles = [orientation.polyform().cells for orientation in self.orientations]
+        self.base = form.cells  # 中心形状
+
+    def neighbours(self, cell):  # (边的下标, 相邻格子, 相邻格子中同一条边的下标)
+        return self.grid.neighbours(cell)
+
+    def around(self, cell):  # 共用顶点的格子,冠状结构要覆盖的是这些格子
+        return self.grid.around(cell)
+
+    def compatible(self, marks, slot, other_marks, other_slot):  # 两条重合的边类型相反才能拼接
+        return marks[slot] == -other_marks[other_slot]
+
+    def anchor(self, tile_cell, target):  # 让tile_cell移到target的平移量,只有种类相同的格子之间才能平移
+        if tile_cell[2:] != target[2:]:
+            return None
+        return (target[0] - tile_cell[0], target[1] - tile_cell[1])
+
+    def translate(self, cell, vector):
+        return self.grid.translate(cell, *vector)
+
+    def shape_at(self, index, vector):  # 生成第index个方向平移vector后的形状
+        return self.orientations[index].translate(*vector)
+
+
+# 把"能围k层"编码成CNF
+class HeeschEncoding:
+    def __init__(self, lattice, level):
+        self.lattice = lattice
+        self.level = level  # 要求的层数k
+        self.num_vars = 0
+        self.clauses = []
+        self.cells = {}  # 摆放(方向编号, 平移量) -> {格子: 边类型}
+        self.covering = {}  # 格子 -> 覆盖它的摆放
+        self.base = dict(lattice.base)
+        self.levels = [set() for _ in range(level + 1)]  # 第l层可能出现的摆放,下标0不用
+        self.x = {}  # (摆放, 层) -> 变量编号
+        self.feasible = self.build()
+
+    def new_var(self):
+        self.num_vars += 1
+        return self.num_vars
+
+    def placement(self, index, vector):  # 摆放占据的格子及其边类型
+        key = (index, vector)
+        if key not in self.cells:
+            lattice = self.lattice
+            self.cells[key] = {lattice.translate(cell, vector): marks for cell, marks in lattice.tiles[index]}
+        return key
+
+    def outside(self, cells):  # 与cells共用顶点但不在cells里的格子
+        res = set()
+        for cell in cells:
+            for other in self.lattice.around(cell):
+                if other not in cells:
+                    res.add(other)
+        return res
+
+    def placements_covering(self, target):  # 所有覆盖target的摆放
+        for index, tile in enumerate(self.lattice.tiles):
+            for cell, marks in tile:
+                vector = self.lattice.anchor(cell, target)
+                if vector is not None:
+                    yield self.placement(index, vector)
+
+    def touches_base(self, key):  # 摆放是否与中心形状共用顶点;如果边不匹配返回None
+        cells = self.cells[key]
+        for cell, marks in cells.items():
+            for slot, other, other_slot in self.lattice.neighbours(cell):
+                if other in self.base and self.lattice.marked and not self.lattice.compatible(marks, slot, self.base[other], other_slot):
+                    return None
+        return any(other in self.base for cell in cells for other in self.lattice.around(cell))
+
+    def build(self):  # 生成各层的候选摆放和所有子句,如果显然无解返回False
+        lattice = self.lattice
+        base_outside = self.outside(self.base)
+        # 第1层: 覆盖中心形状外部格子、不重叠且边匹配的摆放
+        for target in base_outside:
+            for key in self.placements_covering(target):
+                if not any(cell in self.base for cell in self.cells[key]) and self.touches_base(key):
+                    self.levels[1].add(key)
+        # 第l层: 覆盖第l-1层摆放外部格子、且不与中心形状接触的摆放
+        for l in range(2, self.level + 1):
+            targets = set()
+            for key in self.levels[l-1]:
+                targets |= self.outside(self.cells[key])
+            targets -= self.base.keys()
+            targets -= base_outside
+            for target in targets:
+                for key in self.placements_covering(target):
+                    if key in self.levels[l]:
+                        continue
+                    if not any(cell in self.base or cell in base_outside for cell in self.cells[key]):
+                        self.levels[l].add(key)
+
+        used = {}  # 摆放 -> "被使用"变量
+        for l in range(1, self.level + 1):
+            for key in sorted(self.levels[l]):
+                self.x[key, l] = self.new_var()
+                if key not in used:
+                    used[key] = self.new_var()
+        for key, cells in self.cells.items():
+            if key in used:
+                for cell in cells:
+                    self.covering.setdefault(cell, []).append(key)
+
+        clauses = self.clauses
+        # 使用变量与各层变量的关系,一个摆放至多属于一层
+        for key, u in used.items():
+            xs = [self.x[key, l] for l in range(1, self.level + 1) if (key, l) in self.x]
+            clauses.extend([-x, u] for x in xs)
+            clauses.append([-u] + xs)
+            clauses.extend(at_most_one(xs, self.new_var))
+        # 每个格子至多被一个摆放占据
+        for cell, keys in self.covering.items():
+            clauses.extend(at_most_one([used[key] for key in keys], self.new_var))
+        # 边类型不匹配的相邻摆放不能同时使用;同时记录相邻关系
+        adjacent = {key: set() for key in used}
+        for key in used:
+            cells = self.cells[key]
+            matching = {}  # 相邻(共用顶点)的摆放 -> 所有公共边是否都匹配
+            for cell, marks in cells.items():
+                for other in lattice.around(cell):
+                    if other not in cells:
+                        for other_key in self.covering.get(other, []):
+                            matching.setdefault(other_key, True)
+                for slot, other, other_slot in lattice.neighbours(cell):
+                    if other in cells:
+                        continue
+                    for other_key in self.covering.get(other, []):
+                        ok = not lattice.marked or lattice.compatible(marks, slot, self.cells[other_key][other], other_slot)
+                        matching[other_key] = matching.get(other_key, True) and ok
+            for other_key, ok in matching.items():
+                if any(cell in self.cells[other_key] for cell in cells):  # 重叠的摆放由上面的约束排除
+                    continue
+                if ok:
+                    adjacent[key].add(other_key)
+                elif key < other_key:
+                    clauses.append([-used[key], -used[other_key]])
+        # 中心形状外部的每个格子都被第1层覆盖
+        for target in base_outside:
+            options = [self.x[key, 1] for key in self.covering.get(target, []) if (key, 1) in self.x]
+            if not options:
+                return False
+            clauses.append(options)
+        # 第l层形状外部的格子被第l-1, l, l+1层覆盖;第l层形状与第l-1层相邻
+        for l in range(1, self.level + 1):
+            for key in self.levels[l]:
+                x = self.x[key, l]
+                if l < self.level:
+                    for target in self.outside(self.cells[key]):
+                        if target in self.base:
+                            continue
+                        options = [self.x[other, m] for other in self.covering.get(target, [])
+                                   for m in (l-1, l, l+1) if (other, m) in self.x]
+                        clauses.append([-x] + options)
+                if l > 1:
+                    clauses.append([-x] + [self.x[other, l-1] for other in adjacent[key] if (other, l-1) in self.x])
+        return True
+
+    def decode(self, model):  # 从模型中读出各层的形状
+        coronas = [[] for _ in range(self.level)]
+        for (key, l), x in sorted(self.x.items()):
+            if model[x]:
+                coronas[l-1].append(self.lattice.shape_at(*key))
+        return coronas
+
+
+def corona_patch(shape, level, solver=None):  # 找一个k层的冠状结构,找不到返回None
+    encoding = HeeschEncoding(GridLattice(shape), level)
+    if not encoding.feasible:
+        return None
+    model = (solver or CDCLSolver()).solve(encoding.num_vars, encoding.clauses)
+    if model is None:
+        return None
+    return encoding.decode(model)
+
+
+def heesch_number(shape, solver=None, max_level=MAX_LEVEL, on_level=None):  # 逐层加深直到无解,返回(Heesch数, 最深的冠状结构)
+    """ 返回的冠状结构与 heesch_computer() 结果中的一个元素格式相同: 每层一个形状列表。
+    能平铺整个平面的形状每一层都有解,所以最多算到max_level层(默认 lattice.MAX_LEVEL),
+    调用前最好先用 shape.tiles() 排除能平铺的形状;max_level=None时不限层数。
+    on_level与 heesch_computer() 相同: 每找到更深的一层就调用on_level(冠状结构) """
+    heesch, patch = 0, []
+    while max_level is None or heesch < max_level:
+        coronas = corona_patch(shape, heesch + 1, solver)
+        if coronas is None:
+            break
+        heesch, patch = heesch + 1, coronas
+        if on_level is not None:
+            on_level(patch)
+    print(f" The heesch number is {heesch}")
+    return heesch, patch
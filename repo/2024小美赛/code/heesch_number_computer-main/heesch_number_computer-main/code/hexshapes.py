@@ -1,34 +1,55 @@
 from math import sqrt  # 导入数学库中的平方根函数
 
+import time  # 计数器中的计时
+from collections import Counter  # 用于线性时间统计边的出现次数
+
+from lattice import HEX, MAX_LEVEL, HeeschSearch, Polyform, unique  # 与网格无关的冠状结构搜索和逐层计算
+
 # 定义六边形类
 class Hexagon:
-    def __init__(self, x, y, edgedata = [0, 0, 0, 0, 0, 0]):  # 初始化函数,x,y为中心坐标,edgedata为边的类型数据
-        self.origin = (x, y)  # 存储中心点坐标
-        self.edgedata = edgedata  # 存储边的类型数据
-        self.verts = {  # 存储六个顶点的坐标
-        "v1": (x-1,y-1),  # 左下顶点
-        "v2": (x, y-1),   # 下顶点
-        "v3": (x+1, y),   # 右下顶点
-        "v4": (x+1, y+1), # 右上顶点
-        "v5": (x, y+1),   # 上顶点
-        "v6": (x-1, y),   # 左上顶点
-        }
-        # 从底部开始逆时针定义六条边
-        self.edges = [  # 存储边的信息,包括顶点和类型
-        {"edge": {self.verts["v1"], self.verts["v2"]}, "type": edgedata[0]},  # 底边
-        {"edge": {self.verts["v2"], self.verts["v3"]}, "type": edgedata[1]},  # 右下边
-        {"edge": {self.verts["v3"], self.verts["v4"]}, "type": edgedata[2]},  # 右边
-        {"edge": {self.verts["v4"], self.verts["v5"]}, "type": edgedata[3]},  # 右上边
-        {"edge": {self.verts["v5"], self.verts["v6"]}, "type": edgedata[4]},  # 左上边
-        {"edge": {self.verts["v6"], self.verts["v1"]}, "type": edgedata[5]},  # 左边
+    __slots__ = ("origin", "edgedata")  # 只保存中心坐标和边类型,顶点和边按需计算
+
+    def __init__(self, x, y, edgedata = (0, 0, 0, 0, 0, 0)):  # 初始化函数,x,y为中心坐标,edgedata为边的类型数据
+        object.__setattr__(self, "origin", (x, y))  # 存储中心点坐标
+        object.__setattr__(self, "edgedata", tuple(edgedata))  # 存储边的类型数据(元组,不可变)
+
+    def __setattr__(self, name, value):  # 六边形是不可变的值类型
+        raise AttributeError("Hexagon is immutable")
+
+    def __reduce__(self):  # 支持pickle(__slots__加不可变时需要自定义)
+        return (Hexagon, (self.origin[0], self.origin[1], self.edgedata))
+
+    @property
+    def verts(self):  # 六个顶点的坐标,从左下顶点开始逆时针
+        x, y = self.origin
+        return (
+        (x-1, y-1),  # 左下顶点
+        (x, y-1),    # 下顶点
+        (x+1, y),    # 右下顶点
+        (x+1, y+1),  # 右上顶点
+        (x, y+1),    # 上顶点
+        (x-1, y),    # 左上顶点
+        )
+
+    @property
+    def edges(self):  # 从底部开始逆时针的六条边,每条边编码为((顶点a, 顶点b), 类型),顶点按大小排序
+        verts = self.verts
+        return [
+        (edge_key(verts[i], verts[(i+1) % 6]), self.edgedata[i])
+        for i in range(6)
         ]
 
     def to_data(self):  # 将六边形数据转换为列表形式
-        return [self.origin[0], self.origin[1], self.edgedata]
+        return [self.origin[0], self.origin[1], list(self.edgedata)]
 
     def __eq__(self, other):  # 判断两个六边形是否相等
+        if not isinstance(other, Hexagon):
+            return NotImplemented
         return (self.origin == other.origin and self.edgedata == other.edgedata)
 
+    def __hash__(self):  # 与__eq__一致的哈希,可以放进集合和字典
+        return hash((self.origin, self.edgedata))
+
     def flip(self):  # 水平翻转六边形
 
         def edgedata_flip(edgedata):  # 翻转边的类型数据
@@ -67,62 +88,97 @@ class Hexagon:
 
     def plot_data(self):  # 生成绘图数据
         plottinglist = []  # 存储绘图数据的列表
-        for elem in self.edges:  # 遍历每条边
-            el = list(elem["edge"])  # 获取边的顶点
+        for el, type in self.edges:  # 遍历每条边,el为边的两个顶点
             xcoords = [el[0][0]-0.5 * el[0][1], el[1][0]- 0.5 * el[1][1]]  # 计算x坐标
             ycoords = [0.5*sqrt(3)*el[0][1], 0.5*sqrt(3)*el[1][1]]  # 计算y坐标
-            if elem["type"] == 0:  # 如果边的类型为0
+            if type == 0:  # 如果边的类型为0
                 plottinglist.extend([xcoords, ycoords, "k-"])  # 用黑色实线绘制
-            elif elem["type"] == 1 or elem["type"]  == -1:  # 如果边的类型为1或-1
+            elif type == 1 or type  == -1:  # 如果边的类型为1或-1
                 plottinglist.extend([xcoords, ycoords, "k--"])  # 用黑色虚线绘制
         return plottinglist
 
 # 定义由多个六边形组成的形状类
 class HShape:
-    def __init__(self, hexes, priority = []):  # 初始化函数,hexes为六边形列表,priority为优先级列表
-        self.hexes = hexes  # 存储六边形列表
-        self.edges = self.edgemaker()  # 生成边的列表
-        self.priority = priority  # 存储优先级列表
+    __slots__ = ("hexes", "priority", "_edges", "_normal_form")  # 固定属性,节省内存
+
+    def __init__(self, hexes, priority = (), edges = None):  # 初始化函数,hexes为六边形列表,priority为优先级列表
+        object.__setattr__(self, "hexes", tuple(hexes))  # 存储六边形(元组,不可变)
+        object.__setattr__(self, "priority", tuple(priority))  # 存储优先级六边形
+        object.__setattr__(self, "_edges", edges)  # 边的列表,第一次用到时才生成(平移时可以由原形状的边直接得到)
+        object.__setattr__(self, "_normal_form", None)  # 平移归一化后的形状,第一次比较时计算
+
+    def __setattr__(self, name, value):  # 形状是不可变的值类型
+        raise AttributeError("HShape is immutable")
+
+    def __reduce__(self):  # 支持pickle
+        return (HShape, (self.hexes, self.priority))
 
     def to_data(self):  # 将形状数据转换为列表形式
         return [hex.to_data() for hex in self.hexes]
 
-    def __eq__(self, other):  # 判断两个形状是否相等
-        xmin_s = min([hex.origin[0] for hex in self.hexes])  # 当前形状最小x坐标
-        ymin_s = min([hex.origin[1] for hex in self.hexes])  # 当前形状最小y坐标
-        xmin_o = min([hex.origin[0] for hex in other.hexes])  # 另一个形状最小x坐标
-        ymin_o = min([hex.origin[1] for hex in other.hexes])  # 另一个形状最小y坐标
-        return all(hex in other.translate(xmin_s-xmin_o,ymin_s-ymin_o).hexes for hex in self.hexes)
+    def normal_form(self):  # 平移到最小x,y为0的位置后的六边形集合,用于判等和哈希
+        if self._normal_form is None:
+            xmin = min(hex.origin[0] for hex in self.hexes)  # 最小x坐标
+            ymin = min(hex.origin[1] for hex in self.hexes)  # 最小y坐标
+            normal_form = frozenset(
+                (hex.origin[0] - xmin, hex.origin[1] - ymin, hex.edgedata) for hex in self.hexes
+            )
+            object.__setattr__(self, "_normal_form", normal_form)
+        return self._normal_form
+
+    def __eq__(self, other):  # 判断两个形状是否在平移意义下相等
+        if not isinstance(other, HShape):
+            return NotImplemented
+        return self.normal_form() == other.normal_form()
+
+    def __hash__(self):  # 平移不变的哈希,与__eq__一致
+        return hash(self.normal_form())
 
     """ 以下是一些实例化相关的函数 """
+    @property
+    def edges(self):  # 边界边的列表,每条边为((顶点a, 顶点b), 类型),第一次访问时生成并缓存
+        if self._edges is None:
+            object.__setattr__(self, "_edges", self.edgemaker())
+        return self._edges
+
     def edgemaker(self):  # 生成边的列表
         hexes_edge_list = [edge for hex in self.hexes for edge in hex.edges]  # 获取所有六边形的边
-        total_edge_list = [edge for edge in hexes_edge_list if hexes_edge_list.count(edge) == 1]  # 只保留出现一次的边
+        edge_count = Counter(edge for edge, type in hexes_edge_list)  # 线性时间统计每条边出现的次数,与边类型无关
+        total_edge_list = [(edge, type) for edge, type in hexes_edge_list if edge_count[edge] == 1]  # 只保留出现一次的边,内部边的类型不一致时也不算边界
         return total_edge_list
 
     def vertmaker(self):  # 生成顶点列表
         return [hex.origin for hex in self.hexes]
 
     def orientations(self):  # 生成所有可能的方向
-        orientation_list =[  # 包括旋转和翻转的所有组合
-        self,
-        self.turn60(),
-        self.turn60().turn60(),
-        self.turn60().turn60().turn60(),
-        self.turn60().turn60().turn60().turn60(),
-        self.turn60().turn60().turn60().turn60().turn60(),
-        self.flip(),
-        self.flip().turn60(),
-        self.flip().turn60().turn60(),
-        self.flip().turn60().turn60().turn60(),
-        self.flip().turn60().turn60().turn60().turn60(),
-        self.flip().turn60().turn60().turn60().turn60().turn60(),
-        ]
-        new_orientations_list = []  # 存储不重复的方向
-        for orientation in orientation_list:
-            if orientation not in new_orientations_list:
-                new_orientations_list.append(orientation)
-        return new_orientations_list
+        """ 12个对称变换的像直接由变换表算出,先按平移归一化的六边形集合去重,
+        只为不同的方向构造HShape,顺序与 transformations 一致 """
+        orientation_list = []
+        seen = set()
+        for flip, turns in transformations:  # 包括旋转和翻转的所有组合
+            hexes, priority = self.image(flip, turns)
+            xmin = min(hex[0] for hex in hexes)
+            ymin = min(hex[1] for hex in hexes)
+            key = frozenset((x - xmin, y - ymin, edgedata) for x, y, edgedata in hexes)  # 与normal_form()相同
+            if key in seen:  # 去掉重复的方向,保持原有顺序
+                continue
+            seen.add(key)
+            shape = HShape([Hexagon(*hex) for hex in hexes], priority)
+            object.__setattr__(shape, "_normal_form", key)
+            orientation_list.append(shape)
+        return orientation_list
+
+    def image(self, flip, turns):  # 对称变换后的六边形和优先级,编码为(x, y, edgedata)的元组列表
+        ((a, b), (c, d)), perm = symmetry_table[6 * flip + turns]
+        hexes = [(a * x + b * y, c * x + d * y, tuple([hex.edgedata[k] for k in perm]))
+                 for hex in self.hexes for x, y in (hex.origin,)]
+        priority = [] if flip else [Hexagon(a * x + b * y, c * x + d * y, tuple([hex.edgedata[k] for k in perm]))
+                                    for hex in self.priority for x, y in (hex.origin,)]  # 与flip()一致,翻转后不保留优先级
+        return hexes, priority
+
+    def transformed(self, flip, turns):  # 先(可选)翻转,再旋转turns次60度
+        hexes, priority = self.image(flip, turns)
+        return HShape([Hexagon(*hex) for hex in hexes], priority)
 
     def flip(self):  # 水平翻转形状
         new_hexes = []
@@ -138,7 +194,10 @@ class HShape:
         new_priority = []
         for hex in self.priority:
             new_priority.append(hex.translate(xval, yval))
-        return HShape(new_hexes, new_priority)
+        new_edges = None
+        if self._edges is not None:  # 已经算过边: 平移后顶点的大小顺序不变,直接平移每条边
+            new_edges = [(((a[0] + xval, a[1] + yval), (b[0] + xval, b[1] + yval)), type) for (a, b), type in self._edges]
+        return HShape(new_hexes, new_priority, new_edges)
 
     def translate_rel(self, hex1, hex2):  # 相对平移形状
         return self.translate(hex1.origin[0] - hex2.origin[0], hex1.origin[1] - hex2.origin[1])
@@ -152,159 +211,80 @@ class HShape:
             new_priority.append(hex.turn60())
         return HShape(new_hexes, new_priority)
 
-    def inside_remover(self):  # 移除内部的六边形
-        inside_list = []
-        for hex in self.hexes:
-            if all(edge not in self.edges for edge in [elem["edge"] for elem in hex.edges]):
-                inside_list.append(hex)
-        new_hexes = [elem for elem in self.hexes if elem not in inside_list]
-        return new_hexes
-
-    def outside(self):  # 获取外部的六边形
-        def rawhexes(hexlist):  # 将六边形列表转换为原始六边形
-            return [Hexagon(hex.origin[0], hex.origin[1]) for hex in hexlist]
-
-        bighexlist = []  # 存储大六边形列表
-        for vert in self.vertmaker():
-            bighexlist.extend(bighex_maker(vert[0], vert[1]))
-        res = self.priority.copy()  # 复制优先级列表
-        for hex in bighexlist:
-            if hex not in res:
-                res.append(hex)
-        res = [hex for hex in res if hex not in rawhexes(self.hexes)]  # 移除已存在的六边形
-        return res
-
-    def corona_maker(self, base_orientations, bookkeeping=False, heesch=False):  # 生成冠状结构
-
-        def not_occupied_in(elem, config, extra = False):  # 检查位置是否被占用
-            config_hexes = self.hexes.copy() if extra else []
-
-            for shape in config:
-                config_hexes.extend(shape.hexes)
-            for hex in config_hexes:
-                if elem.origin == hex.origin:
-                    return False
-
-            return True
-
-        def edge_filter(edgelist_ns, edgelist_config):  # 过滤边
-            config_edges = [edge["edge"] for edge in edgelist_config]
-            ns_edges = [edge["edge"] for edge in edgelist_ns]
-            for i in range(len(ns_edges)):
-                if ns_edges[i] in config_edges:
-                    if not edgelist_ns[i]["type"] == -1 * edgelist_config[config_edges.index(ns_edges[i])]["type"]:
-                        return False
-            return True
-
-        def config_edgemaker(config):  # 生成配置的边
-            hexes_edge_list = [edge for shape in config+[self] for edge in shape.edges]
-            total_edge_list = [edge for edge in hexes_edge_list if hexes_edge_list.count(edge) == 1]
-            return total_edge_list
-
-        bookkeeper = []  # 存储过程记录
-        possible_config = []  # 存储可能的配置
-        outside_list = self.outside()  # 获取外部六边形
-        for i in range(len(outside_list)):  # 遍历外部六边形
-            print(f"test: we are now at {int((i+1)/len(outside_list)*100)}% ")  # 打印进度
-            outs_hex = outside_list[i]
-            if len(possible_config) == 0:  # 如果没有可能的配置
-                for index in range(len(base_orientations)):
-                    for ns_hex in base_orientations[index].hexes:
-                        new_shape = base_orientations[index].translate_rel(outs_hex, ns_hex)
-                        if all(not_occupied_in(hex, [self]) for hex in new_shape.hexes) and edge_filter(new_shape.edges, self.edges):
-                            possible_config.append([new_shape])
-                if bookkeeping:
-                    bookkeeper.append(possible_config)
-                print(len(possible_config))
-
-            else:  # 如果已有可能的配置
-                new_possible_config = []
-                for config in possible_config:
-                    if not_occupied_in(outs_hex, config):
-                        for index in range(len(base_orientations)):
-                            for ns_hex in base_orientations[index].hexes:
-                                new_shape = base_orientations[index].translate_rel(outs_hex, ns_hex)
-                                if all(not_occupied_in(hex, config, extra=True) for hex in new_shape.hexes) and edge_filter(new_shape.edges, config_edgemaker(config)):
-                                    new_config = config.copy()
-                                    new_config.append(new_shape)
-                                    new_possible_config.append(new_config)
-                                else:
-                                    continue
-                    else:
-                        new_possible_config.append(config)
-                if new_possible_config == []:
-                    return []
-                possible_config = new_possible_config.copy()
-                if bookkeeping:
-                    bookkeeper.append(possible_config)
-                print(len(possible_config))
+    def inside_remover(self):  # 移除内部的六边形,只保留至少有一条边在边界上的六边形
+        boundary = {edge for edge, type in self.edges}  # 边界边的集合
+        return [hex for hex in self.hexes if any(edge in boundary for edge, type in hex.edges)]
+
+    def polyform(self):  # 对应的 lattice.Polyform,搜索和逐层计算都由lattice.py完成
+        return Polyform(HEX, [(hex.origin, hex.edgedata) for hex in self.hexes], [hex.origin for hex in self.priority])
+
+    def outside(self):  # 获取外部的六边形,优先级六边形在前,其余的与 bighex_maker 的顺序一致
+        return [Hexagon(x, y) for x, y in self.polyform().outside()]
+
+    def corona_maker(self, base_orientations, heesch=False, symmetry=False, dynamic=False, engine="search", counters=None):  # 生成冠状结构的列表
+        possible_config = list(self.corona_iter(base_orientations, symmetry, dynamic, engine, counters))
         return [[config] for config in possible_config] if heesch else possible_config
 
+    def corona_iter(self, base_orientations, symmetry=False, dynamic=False, engine="search", counters=None):  # 逐个生成完整的冠状结构
+        for config in self.corona_placements(base_orientations, symmetry, dynamic, engine, counters):
+            yield [base_orientations[index].translate(dx, dy) for index, dx, dy in config]
+
+    def corona_placements(self, base_orientations, symmetry=False, dynamic=False, engine="search", counters=None):  # 逐个生成冠状结构的摆放元组
+        """ 每个冠状结构是摆放(方向编号, dx, dy)的元组,比形状列表紧凑,适合在进程之间传递。
+        默认按outside()的顺序依次覆盖外部六边形,dynamic=True时每一步选合法摆放最少的未覆盖外部六边形;
+        symmetry=True时只生成中心形状的对称变换下等价的冠状结构中的一个代表;
+        engine="dlx"时改用Dancing Links精确覆盖。搜索见 lattice.corona_placements """
+        return self.polyform().corona_placements(base_orientations, symmetry, dynamic, engine, counters)
+
     def second_corona(self):  # 生成第二层冠状结构
-        next_corona_list = []
-        coronalist = self.corona_maker(self.orientations())  # 生成第一层冠状结构
-        for i in range(len(coronalist)):
-            corona = coronalist[i]
-            print(f"CORONA we are now at {int((i+1)/len(coronalist)*100)}% ")  # 打印进度
-            pre_priority = [hex for shape in corona+[self] for hex in shape.priority]
-            priority = []
-            for hex in  pre_priority:
-                if hex not in priority:
-                    priority.append(hex)
+        return list(self.second_corona_iter())
+
+    def second_corona_iter(self, metrics=None):  # 逐个生成能再围一层的第一层冠状结构
+        """ metrics不为None时,每个第一层冠状结构外的搜索作为一次第2层事件输出(见metrics.py) """
+        orientations = self.orientations()
+        for i, corona in enumerate(self.corona_iter(orientations)):
+            priority = unique([hex for shape in corona+[self] for hex in shape.priority])
             new_shape = HShape([hex for shape in corona+[self] for hex in shape.hexes],
             priority = priority)
-            new_corona = new_shape.corona_maker(self.orientations())
+            start = time.perf_counter()
+            counters = {} if metrics is not None else None
+            new_corona = new_shape.corona_maker(orientations, counters=counters)
+            if metrics is not None:
+                metrics.add(counters)
+                metrics.end_level(2, 1, len(new_corona), time.perf_counter() - start)
             if new_corona == []:
                 pass
             else:
-                next_corona_list.append({"first": corona, "second": new_corona})
-        return next_corona_list
+                yield {"first": corona, "second": new_corona}
 
     """ 计算Heesch数 """
 
-    def heesch_corona(self, coronalist):  # 计算Heesch冠状结构
-        next_corona_list = []
-        for i in range(len(coronalist)):
-            print(f" heesch_corona:we are now at {int((i+1)/len(coronalist)*100)}% ")  # 打印进度
-            corona_config = coronalist[i]
-            ns_hexes = self.hexes.copy()
-            for corona in corona_config:
-                for shape in corona:
-                    ns_hexes.extend(shape.hexes)
-            new_shape = HShape(ns_hexes)
-            new_corona = new_shape.corona_maker(self.orientations())
-
-            for elem in new_corona:
-                new_corona_config = corona_config.copy()
-                new_corona_config.append(elem)
-                next_corona_list.append(new_corona_config)
-        return next_corona_list
-
-    def heesch_computer(self):  # 计算Heesch数
-        coronalist = self.corona_maker(self.orientations(), heesch=True)
-        if coronalist == []:
-            return []
-        else:
-            i = 0
-            while True:
-                message = f"""
-                --------------------------------------
-                We are now computing the {i+2}nd corona
-                --------------------------------------
-                """
-                print(message)
-                new_corona_list = self.heesch_corona(coronalist)
-                if new_corona_list == []:
-                    print(f" The heesch number is {i+1}")
-                    return coronalist
-                else:
-                    coronalist = new_corona_list.copy()
-                    i += 1
+    def heesch_corona(self, frontier, symmetry=False, workers=None, chunksize=None,
+                      start=0, next_frontier=None, on_expanded=None, dynamic=False, engine="search", metrics=None):  # 计算Heesch冠状结构
+        """ frontier是当前层的配置(见frontier.py),返回下一层的Frontier,见 lattice.HeeschSearch.heesch_corona """
+        search = HeeschSearch(self, symmetry, dynamic, engine)
+        return search.heesch_corona(frontier, workers, chunksize, start, next_frontier, on_expanded, metrics)
+
+    def heesch_computer(self, symmetry=False, workers=None, checkpoint=None, table=None, dynamic=False, engine="search",
+                        max_level=MAX_LEVEL, check_tiling=True, metrics=None, timeout=None, on_level=None):  # 计算Heesch数,symmetry=True时每层只保留对称等价类的代表,workers>1时并行,dynamic=True时动态选择外部六边形
+        """ 逐层计算由 lattice.HeeschSearch 完成(置换表去重、进程池、检查点、计数器、超时),
+        返回能围到的最后一层的所有配置,每个配置每层一个HShape列表;能平铺平面时返回None """
+        search = HeeschSearch(self, symmetry, dynamic, engine)
+        return search.heesch_computer(workers, checkpoint, table, max_level, check_tiling, metrics, timeout, on_level)
+
+    def tiles(self):  # 快速判定能否平铺平面(充分条件),与其他网格共用 lattice.tiles
+        """ 形状本身,或者它和一个边匹配的相邻形状组成的拼块,边界词满足Beauquier-Nivat条件时
+        只用平移就能铺满平面(后者允许相邻的那一块旋转或翻转)。返回False不代表不能平铺 """
+        return self.polyform().tiles()
+
+    def has_heesch_at_least(self, k, symmetry=False, dynamic=False, engine="search"):  # 判定Heesch数是否至少为k,找到第一个k层的拼块就返回
+        """ 深度优先地逐层往外围,见 lattice.HeeschSearch.has_heesch_at_least。
+        返回(True, 见证)或(False, None),见证与 heesch_computer() 结果中的一个元素格式相同 """
+        return HeeschSearch(self, symmetry, dynamic, engine).has_heesch_at_least(k)
 
     def plot_data(self, color= "k"):  # 生成绘图数据,默认使用黑色
         plottinglist = []
-        for edge in self.edges:
-            el = list(edge["edge"])
+        for el, type in self.edges:
             xcoords = [el[0][0]-0.5 * el[0][1], el[1][0]- 0.5 * el[1][1]]  # 计算x坐标
             ycoords = [0.5*sqrt(3)*el[0][1], 0.5*sqrt(3)*el[1][1]]  # 计算y坐标
             plottinglist.extend([xcoords, ycoords, f"{color}-"])
@@ -313,13 +293,33 @@ class HShape:
     def outside_plot_data(self):  # 生成外部六边形的绘图数据
         plottinglist = []
         for elem in self.outside():  # 遍历外部六边形
-            for edge in [elem2["edge"] for elem2 in elem.edges]:  # 遍历每条边
-                el = list(edge)
+            for el, type in elem.edges:  # 遍历每条边
                 xcoords = [el[0][0]-0.5 * el[0][1], el[1][0]- 0.5 * el[1][1]]  # 计算x坐标
                 ycoords = [0.5*sqrt(3)*el[0][1], 0.5*sqrt(3)*el[1][1]]  # 计算y坐标
                 plottinglist.extend([xcoords, ycoords, "k:"])  # 用黑色点线绘制
         return plottinglist
 
+# 12个对称变换(是否翻转, 旋转60度的次数),顺序与orientations()一致
+transformations = [(flip, turns) for flip in (False, True) for turns in range(6)]
+
+
+def _symmetry_table():  # 每个对称变换的整数矩阵和边类型置换: 新中心 = 矩阵 * 中心,新edgedata[i] = edgedata[perm[i]]
+    table = []
+    for flip, turns in transformations:
+        if flip:  # Hexagon.flip: (x, y) -> (y - x, y)
+            matrix, perm = ((-1, 1), (0, 1)), (0, 5, 4, 3, 2, 1)
+        else:
+            matrix, perm = ((1, 0), (0, 1)), (0, 1, 2, 3, 4, 5)
+        for _ in range(turns):  # Hexagon.turn60: (x, y) -> (x - y, x),边类型循环右移一位
+            matrix = ((matrix[0][0] - matrix[1][0], matrix[0][1] - matrix[1][1]), matrix[0])
+            perm = perm[5:] + perm[:5]
+        table.append((matrix, perm))
+    return table
+
+
+symmetry_table = _symmetry_table()  # 下标与transformations一致: 6 * flip + turns
+
+
 # 生成大六边形
 def bighex_maker(x,y):  # 根据中心点坐标生成由7个六边形组成的大六边形
     hexes = [
@@ -332,3 +332,9 @@ def bighex_maker(x,y):  # 根据中心点坐标生成由7个六边形组成的
     Hexagon(x-2, y-1),  # 左六边形
     ]
     return hexes
+
+
+# 边的编码
+def edge_key(vert1, vert2):  # 把两个顶点排序后组成元组,作为边的规范编码
+    return (vert1, vert2) if vert1 <= vert2 else (vert2, vert1)
+
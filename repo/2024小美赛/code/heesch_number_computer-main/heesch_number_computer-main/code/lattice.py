@@ -0,0 +1,909 @@
+import time  # 计数器中的计时
+from collections import Counter, deque  # 统计边的出现次数; 已提交的任务块
+from concurrent.futures import ProcessPoolExecutor  # 并行扩展冠状结构
+from functools import lru_cache  # 摆放表的缓存
+from itertools import islice  # 把任务分块
+
+from checkpoint import Checkpoint  # heesch_computer的检查点
+from dlx import dlx_placements  # engine="dlx"时的精确覆盖
+from frontier import Frontier  # heesch_computer每层配置的紧凑存储
+from metrics import new_counts  # 搜索的计数器
+
+
+""" 与网格无关的冠状结构搜索和Heesch数计算
+
+六边形(hexshapes)、三角形(shapes)和正方形网格共用同一套搜索,每种网格只需要给出:
+    1) 格子的编码: (x, y) + 种类,例如三角形是(x, y, up),六边形和正方形的种类为空;
+       平移(dx, dy)只改变x, y,种类相同的格子之间才能互相平移
+    2) vertices(cell): 格子的顶点(整数坐标),按逆时针顺序,第i条边是第i个到第i+1个顶点,
+       与edgedata的下标一致;平移格子时顶点平移相同的量,所以边编码用 edge_code
+    3) cell_at(vertices): vertices的逆
+    4) matrices: 对称群在顶点坐标上的整数矩阵,顺序为(是否翻转, 旋转次数)
+相邻格子(共用边)和周围格子(共用顶点)的偏移表由顶点自动算出。
+形状统一表示为(格子, edgedata)的列表,Polyform 是任意网格上的形状。
+一层冠状结构的搜索(corona_placements)和逐层计算(HeeschSearch: 置换表去重、进程池、检查点、计数器)
+都只在这里实现一次,HShape、Shape 和 Polyform 只需要提供:
+    1) polyform(): 形状对应的 Polyform,priority是最先覆盖的外部格子
+    2) orientations(): 所有方向,结果中的形状都是某个方向平移(translate)得到的 """
+
+
+# heesch_computer默认最多计算的层数: 已知的Heesch数最大是6,
+# tiles()只是充分条件,没被识别出的平铺形状每一层都有解,靠这个上限停下来
+MAX_LEVEL = 6
+
+
+# 边的编码
+EDGE_STRIDE = 1 << 32  # 边编码中x部分的权重
+
+
+def edge_code(edge):  # 把边编码成整数: 两个顶点坐标之和(即中点的两倍)唯一确定一条边
+    (x1, y1), (x2, y2) = edge
+    return (x1 + x2) * EDGE_STRIDE + (y1 + y2)
+
+
+def edge_shift(xval, yval):  # 平移(xval, yval)时边编码的增量,平移一条边只需要做一次加法
+    return 2 * (xval * EDGE_STRIDE + yval)
+
+
+# 保序去重
+def unique(items):  # 借助集合在线性时间内去掉重复元素,保留第一次出现的顺序
+    seen = set()
+    res = []
+    for item in items:
+        if item not in seen:
+            seen.add(item)
+            res.append(item)
+    return res
+
+
+def _matrix_product(m, n):  # 2x2整数矩阵的乘积m * n
+    return tuple(tuple(sum(m[i][k] * n[k][j] for k in range(2)) for j in range(2)) for i in range(2))
+
+
+def _group(turn, flip, order):  # 先(可选)翻转,再旋转turns次,顺序与 hexshapes.transformations 一致
+    matrices = []
+    for first in (((1, 0), (0, 1)), flip):
+        matrix = first
+        for _ in range(order):
+            matrices.append(matrix)
+            matrix = _matrix_product(turn, matrix)
+    return matrices
+
+
+class Grid:
+    name = None
+    kinds = [()]  # 格子编码中(x, y)之后的部分
+    matrices = []  # 对称变换在顶点坐标上的矩阵
+
+    def __init__(self):
+        self._around = None  # 种类 -> 共用顶点的格子的偏移
+        self._neighbours = None  # 种类 -> 共用边的格子的(边的下标, 偏移, 邻居中同一条边的下标)
+
+    def is_period(self, dx, dy):  # (dx, dy)是否把格子平移成格子
+        return True
+
+    def translate(self, cell, dx, dy):
+        return (cell[0] + dx, cell[1] + dy) + cell[2:]
+
+    def edge_pairs(self, cell):  # 每条边的两个顶点,下标与edgedata一致
+        verts = self.vertices(cell)
+        return [(verts[i], verts[(i + 1) % len(verts)]) for i in range(len(verts))]
+
+    def edges(self, cell, edgedata):  # (边编码, 类型)的列表
+        return [(edge_code(pair), type) for pair, type in zip(self.edge_pairs(cell), edgedata)]
+
+    def _tables(self):  # 由顶点算出周围格子和相邻格子的偏移表
+        self._around, self._neighbours = {}, {}
+        for kind in self.kinds:
+            root = (0, 0) + kind
+            verts = set(self.vertices(root))
+            pairs = {frozenset(pair): slot for slot, pair in enumerate(self.edge_pairs(root))}
+            around, neighbours = [], []
+            for other_kind in self.kinds:
+                for vx, vy in self.vertices(root):
+                    for ox, oy in self.vertices((0, 0) + other_kind):
+                        dx, dy = vx - ox, vy - oy
+                        other = (dx, dy) + other_kind
+                        if other == root or other in around or not self.is_period(dx, dy):
+                            continue
+                        around.append(other)
+                        shared = verts & set(self.vertices(other))
+                        if len(shared) == 2:
+                            for other_slot, pair in enumerate(self.edge_pairs(other)):
+                                if frozenset(pair) == shared:
+                                    neighbours.append((pairs[frozenset(pair)], other, other_slot))
+            self._around[kind] = around
+            self._neighbours[kind] = sorted(neighbours)
+        return self._around, self._neighbours
+
+    def around(self, cell):  # 与cell共用顶点的格子
+        table = self._around if self._around is not None else self._tables()[0]
+        x, y = cell[0], cell[1]
+        return [(x + other[0], y + other[1]) + other[2:] for other in table[cell[2:]]]
+
+    def neighbours(self, cell):  # 与cell共用边的格子: (边的下标, 相邻格子, 相邻格子中同一条边的下标)
+        table = self._neighbours if self._neighbours is not None else self._tables()[1]
+        x, y = cell[0], cell[1]
+        return [(slot, (x + other[0], y + other[1]) + other[2:], other_slot) for slot, other, other_slot in table[cell[2:]]]
+
+    def outside(self, cells):  # 与cells共用顶点但不在cells里的格子,按第一次出现的顺序
+        return [cell for cell in unique([other for cell in cells for other in self.around(cell)]) if cell not in cells]
+
+    def boundary(self, cells):  # cells(格子 -> edgedata)的边界边: (边编码, 类型)的列表
+        edges = [edge for cell, edgedata in cells.items() for edge in self.edges(cell, edgedata)]
+        count = Counter(code for code, type in edges)
+        return [(code, type) for code, type in edges if count[code] == 1]
+
+    def transform(self, cells, symmetry):  # 对(格子, edgedata)的列表做第symmetry个对称变换,边类型跟着边走
+        (a, b), (c, d) = self.matrices[symmetry]
+        res = []
+        for cell, edgedata in cells:
+            verts = [(a * x + b * y, c * x + d * y) for x, y in self.vertices(cell)]
+            image = self.cell_at(verts)
+            slots = {frozenset(pair): slot for slot, pair in enumerate(self.edge_pairs(image))}
+            new_edgedata = [0] * len(edgedata)
+            for i, type in enumerate(edgedata):
+                new_edgedata[slots[frozenset((verts[i], verts[(i + 1) % len(verts)]))]] = type
+            res.append((image, tuple(new_edgedata)))
+        return res
+
+
+class HexGrid(Grid):  # 与 hexshapes.Hexagon 相同的坐标,中心坐标满足x + y是3的倍数
+    name = "hex"
+    matrices = _group(((1, -1), (1, 0)), ((-1, 1), (0, 1)), 6)
+    around_order = [(-1, -2), (1, -1), (2, 1), (1, 2), (-1, 1), (-2, -1)]  # 与 hexshapes.bighex_maker 的顺序相同
+
+    def _tables(self):  # 周围格子按around_order排列,所以 outside() 的顺序与原来的 HShape.outside() 相同
+        around, neighbours = super()._tables()
+        around[()].sort(key=self.around_order.index)
+        return around, neighbours
+
+    def is_period(self, dx, dy):
+        return (dx + dy) % 3 == 0
+
+    def vertices(self, cell):  # 与 Hexagon.verts 一致
+        x, y = cell
+        return ((x-1, y-1), (x, y-1), (x+1, y), (x+1, y+1), (x, y+1), (x-1, y))
+
+    def cell_at(self, vertices):  # 中心是顶点的平均值
+        return (sum(x for x, y in vertices) // 6, sum(y for x, y in vertices) // 6)
+
+
+class TriangleGrid(Grid):  # 与 shapes.Triangle 相同的坐标: (x, y, up),(x, y)是v1
+    name = "triangle"
+    kinds = [(True,), (False,)]
+    matrices = _group(((1, -1), (1, 0)), ((-1, 1), (0, 1)), 6)
+
+    def vertices(self, cell):  # 与 Triangle 的 v1, v2, v3 一致
+        x, y, up = cell
+        return ((x, y), (x+1, y), (x+1, y+1)) if up else ((x, y), (x+1, y), (x, y-1))
+
+    def cell_at(self, vertices):  # 顶点坐标之和模3区分朝上和朝下
+        sx = sum(x for x, y in vertices)
+        sy = sum(y for x, y in vertices)
+        if sx % 3 == 2:
+            return ((sx - 2) // 3, (sy - 1) // 3, True)
+        return ((sx - 1) // 3, (sy + 1) // 3, False)
+
+
+class SquareGrid(Grid):  # 正方形(x, y)是以(x, y)为左下角的单位正方形
+    name = "square"
+    matrices = _group(((0, -1), (1, 0)), ((-1, 0), (0, 1)), 4)
+
+    def vertices(self, cell):  # 从左下角开始逆时针,边依次为下、右、上、左
+        x, y = cell
+        return ((x, y), (x+1, y), (x+1, y+1), (x, y+1))
+
+    def cell_at(self, vertices):
+        return (min(x for x, y in vertices), min(y for x, y in vertices))
+
+
+HEX, TRIANGLE, SQUARE = HexGrid(), TriangleGrid(), SquareGrid()
+grids = {grid.name: grid for grid in (HEX, TRIANGLE, SQUARE)}
+
+
+# 摆放表
+def placement_table(grid, tiles):  # 种类 -> 每个(方向, 锚点)的相对格子、相对边和兼容签名
+    """ tiles是每个方向的(格子, edgedata)列表。锚点是方向中的一个格子,
+    摆放到外部格子c上时锚点与c重合,所以只有种类与c相同的锚点可用 """
+    return _placement_table(grid, tuple(tuple(tile) for tile in tiles))
+
+
+@lru_cache(maxsize=16)  # 只留最近用到的几组方向,批量计算很多形状时内存不会一直增长
+def _placement_table(grid, tiles):
+    marked = any(any(edgedata) for tile in tiles for cell, edgedata in tile)
+    table = {kind: [] for kind in grid.kinds}
+    for index, tile in enumerate(tiles):
+        edges = grid.boundary(dict(tile))
+        for anchor, edgedata in tile:
+            ax, ay = anchor[0], anchor[1]
+            cells = tuple((cell[0] - ax, cell[1] - ay, cell[2:]) for cell, edgedata in tile)  # 相对锚点的格子
+            rel_edges = tuple((code - edge_shift(ax, ay), type) for code, type in edges)  # 相对锚点的边界边编码
+            signature = tuple((code, -type) for code, type in rel_edges) if marked else ()  # 没有边类型时不需要匹配
+            table[anchor[2:]].append((index, ax, ay, cells, rel_edges, signature))
+    return table
+
+
+def transform(grid, cells, element):  # (格子, edgedata)的列表在对称变换element = (变换编号, dx, dy)下的像
+    symmetry, dx, dy = element
+    return [(grid.translate(cell, dx, dy), edgedata) for cell, edgedata in grid.transform(cells, symmetry)]
+
+
+def corona_placements(grid, cells, tiles, outside=None, counters=None, dynamic=True, symmetry=False, engine="search",
+                      deadline=None):  # 逐个生成cells外一层冠状结构的摆放元组
+    """ cells是拼块(格子 -> edgedata),tiles是所有方向的(格子, edgedata)列表,
+    每个冠状结构是摆放(方向编号, dx, dy)的元组。外部格子默认按 Grid.outside 的顺序,
+    也可以由调用者给出(例如 HShape 的priority)。
+    精确覆盖的深度优先搜索,只保留当前搜索路径上的摆放,内存只和搜索深度有关:
+        1) 每个外部格子的候选摆放只在第一次用到时算一次: 不与拼块重叠,与拼块重合的边类型相反
+        2) 搜索时每个用到的格子是整数的一位,重叠判定只需要一次按位与
+        3) 每一步选一个未覆盖的外部格子: dynamic=True时选合法摆放最少的,否则按outside的顺序选第一个;
+           选中的格子没有合法摆放时立即回溯
+    拼块的边不会被两个摆放共用(它们会重叠),所以搜索中只需要检查摆放之间的边。
+    symmetry=True时只生成拼块的对称变换下等价的冠状结构中的一个代表:
+    覆盖第一个选中的格子c0的摆放必须是它在对称群下的像中最小的,完整的结构再取最小的。
+    engine="dlx"时改用Dancing Links精确覆盖(见dlx.py),结果相同,顺序不同。
+    counters是字典时按外部格子累加计数(格式见metrics.py,dlx不统计)。
+    deadline是 time.time() 的截止时刻,搜索的第一步和之后每1024步检查一次(dlx每生成一个结构检查一次),
+    超过后抛出TimeoutError,不依赖信号,在任何平台和进程池里都能用 """
+    if outside is None:
+        outside = grid.outside(cells)
+    if engine == "dlx":
+        if symmetry:
+            raise ValueError("symmetry pruning is only implemented for engine='search'")
+        for config in dlx_placements(grid, cells, tiles, outside):
+            if deadline is not None and time.time() > deadline:
+                raise TimeoutError("corona search passed its deadline")
+            yield config
+        return
+    table = placement_table(grid, tiles)
+    marked = any(entry[5] for entries in table.values() for entry in entries)
+    boundary = dict(grid.boundary(cells))  # 拼块的边界边编码 -> 边类型
+    bits = {cell: 1 << k for k, cell in enumerate(outside)}  # 格子 -> 它在占用掩码中的位
+
+    def prepare(target):  # 第一次用到一个外部格子时才算出它的候选摆放
+        start = time.perf_counter()
+        cell = target[2]
+        ox, oy = cell[0], cell[1]
+        shift = edge_shift(ox, oy)
+        entries = table[cell[2:]]
+        found = []
+        overlap = edge = 0
+        for index, ax, ay, rel_cells, edges, signature in entries:
+            new_cells = [(x + ox, y + oy) + kind for x, y, kind in rel_cells]
+            if not occupied.isdisjoint(new_cells):
+                overlap += 1
+                continue
+            if any(boundary.get(code + shift, need) != need for code, need in signature):
+                edge += 1
+                continue
+            mask = 0
+            for new_cell in new_cells:
+                if new_cell not in bits:
+                    bits[new_cell] = 1 << len(bits)
+                mask |= bits[new_cell]
+            new_edges = [(code + shift, type) for code, type in edges] if marked else ()
+            found.append(((index, ox - ax, oy - ay), mask, new_edges))
+        target[1] = found
+        if counters is not None:  # 准备候选时的计数,与第一次搜索这个格子的计数一起计入counters
+            target[3] = new_counts()  # 留下的摆放在搜索时才算一次尝试,所以这里只计被拒绝的
+            target[3][1:4] = overlap + edge, overlap, edge
+            target[3][5] = time.perf_counter() - start
+        return found
+
+    occupied = cells.keys()
+    targets = [[bits[cell], None, cell, None] for cell in outside]  # 每个外部格子的(位, 候选摆放, 格子, 准备时的计数)
+
+    placed_edges = {}  # 已放入的摆放的边编码 -> 边类型
+    config, masks, added = [], [], []  # 当前路径上的摆放、占据的位和新加入placed_edges的边
+    started = set()  # 已经计入counters的外部格子
+
+    def fits(new_edges):  # 与已放入的摆放重合的边类型相反
+        for code, type in new_edges:
+            other = placed_edges.get(code)
+            if other is not None and other != -type:
+                return False
+        return True
+
+    def options(found, filled, limit):  # found中与已放入的摆放相容的,达到limit个时返回None
+        res = []
+        for option in found:
+            if option[1] & filled or marked and not fits(option[2]):
+                continue
+            res.append(option)
+            if len(res) == limit:
+                return None
+        return res
+
+    def counted_options(found, filled, cell, prepared):  # 与options相同,同时累加cell的计数,不提前结束
+        start = time.perf_counter()
+        counts = counters.get(cell)
+        if counts is None:
+            counts = counters[cell] = new_counts()
+        if cell not in started:
+            started.add(cell)
+            for k, value in enumerate(prepared):
+                counts[k] += value
+        res = []
+        for option in found:
+            if option[1] & filled:
+                counts[2] += 1  # 重叠
+            elif marked and not fits(option[2]):
+                counts[3] += 1  # 边不匹配
+            else:
+                res.append(option)
+        counts[0] += 1
+        counts[1] += len(found)
+        counts[4] += len(res)
+        counts[5] += time.perf_counter() - start
+        return res
+
+    def candidates(target, filled, limit=-1):  # 外部格子target的合法摆放,不少于limit个时返回None
+        found, prepared = target[1], target[3]
+        if found is None:
+            found = prepare(target)
+            prepared = target[3]
+        if counters is None:
+            return options(found, filled, limit)
+        res = counted_options(found, filled, target[2], prepared)
+        return None if len(res) >= limit >= 0 else res
+
+    def most_constrained(filled):  # 合法摆放最少的未覆盖外部格子和它的候选列表,全部覆盖时返回None
+        best = None
+        for target in targets:
+            if target[0] & filled:
+                continue
+            res = candidates(target, filled, -1 if best is None else len(best[1]))  # 只有比best少时才需要完整的列表
+            if res is not None:
+                best = target[2], res
+                if len(res) <= 1:  # 不可能更少了(0个时这一支直接失败)
+                    break
+        return best
+
+    def first_uncovered(filled):  # 按outside的顺序第一个未覆盖的外部格子和它的候选列表,全部覆盖时返回None
+        for target in targets:
+            if not target[0] & filled:
+                return target[2], candidates(target, filled)
+        return None
+
+    def cells_of(placement):  # 摆放中的(格子, edgedata)
+        index, dx, dy = placement
+        return [(grid.translate(cell, dx, dy), edgedata) for cell, edgedata in tiles[index]]
+
+    def image_key(placement, element):  # 对称变换后的摆放,用排序后的元组比较大小
+        key = (placement, element)
+        if key not in images:
+            images[key] = tuple(sorted(transform(grid, cells_of(placement), element)))
+        return images[key]
+
+    def orbit_pruned(placement):  # 覆盖c0轨道上格子的摆放变回c0后不能比第一个摆放小
+        for cell, edgedata in cells_of(placement):
+            for element in watch.get(cell, ()):
+                if image_key(placement, element) < first_key:
+                    return True
+        return False
+
+    def is_canonical():  # 完整的冠状结构是否是它的轨道中最小的代表
+        keys = [tuple(sorted(cells_of(placement))) for placement in config]
+        own = (keys[0], sorted(keys))  # 先比较覆盖c0的摆放,再比较整体
+        for element in group:
+            images = [image_key(placement, element) for placement in config]
+            first = next(image for image in images if any(cell == c0 for cell, edgedata in image))
+            if (first, sorted(images)) < own:
+                return False
+        return True
+
+    select = most_constrained if dynamic else first_uncovered
+    filled = 0  # 已占据的位
+    chosen = select(filled)
+    if chosen is None:
+        return
+    group = Polyform(grid, cells.items()).stabilizer()[1:] if symmetry else []  # 拼块的非平凡对称变换
+    c0, first_key = chosen[0], None  # 对称剪枝用: 第一个选中的格子和覆盖它的摆放
+    watch, images = {}, {}  # 格子 -> 把它映到c0的对称变换; (摆放, 对称变换) -> 像
+    for element in group:
+        for cell in outside:
+            if transform(grid, [(cell, (0,) * len(grid.vertices(cell)))], element)[0][0] == c0:
+                watch.setdefault(cell, []).append(element)
+    frames = [iter(chosen[1])]  # 每一层是一个候选摆放的迭代器
+    steps = 0  # 搜索的步数,用来间隔地检查截止时间
+    while frames:
+        if deadline is not None and not steps & 1023 and time.time() > deadline:  # 第一步也检查,拼块多而每个很快时不会漏掉
+            raise TimeoutError("corona search passed its deadline")
+        steps += 1
+        option = next(frames[-1], None)
+        if option is None:  # 这一层的候选用完了,回溯到上一层
+            frames.pop()
+            if config:
+                config.pop()
+                filled ^= masks.pop()
+                for code in added.pop():
+                    del placed_edges[code]
+            continue
+        placement, mask, new_edges = option
+        if group:
+            if not config:  # 覆盖c0的摆放
+                first_key = tuple(sorted(cells_of(placement)))
+            if orbit_pruned(placement):  # 与已搜索过的分支对称
+                continue
+        config.append(placement)
+        masks.append(mask)
+        filled |= mask
+        new_codes = [(code, type) for code, type in new_edges if code not in placed_edges]  # 已有的边不会再被第三个摆放用到
+        placed_edges.update(new_codes)
+        added.append([code for code, type in new_codes])
+        chosen = select(filled)
+        if chosen is None:  # 所有外部格子都被覆盖,得到一个完整的冠状结构
+            if not group or is_canonical():
+                yield tuple(config)
+            frames.append(iter(()))  # 下一次循环时回溯
+        else:
+            frames.append(iter(chosen[1]))
+
+
+# 平铺判定
+def _signed_area(verts):  # 多边形面积的两倍,顶点逆时针时为正
+    return sum(verts[i - 1][0] * verts[i][1] - verts[i][0] * verts[i - 1][1] for i in range(len(verts)))
+
+
+def boundary_steps(grid, cells):  # 沿边界逆时针走一圈的边: (起点, 终点, 边类型)的列表;边界不止一圈时返回None
+    """ cells是格子 -> edgedata。有洞、不连通或两段边界在一个顶点相接时边界不是一条简单闭曲线,返回None。
+    三角形网格中朝下的三角形的顶点是顺时针的,它的边界边反过来走 """
+    count = Counter(edge_code(pair) for cell in cells for pair in grid.edge_pairs(cell))
+    steps = {}  # 起点 -> (终点, 边类型)
+    edges = 0
+    for cell, edgedata in cells.items():
+        clockwise = _signed_area(grid.vertices(cell)) < 0
+        for (a, b), type in zip(grid.edge_pairs(cell), edgedata):
+            if count[edge_code((a, b))] == 1:  # 在边界上
+                if clockwise:
+                    a, b = b, a
+                if a in steps:  # 两段边界在顶点a相接
+                    return None
+                steps[a] = (b, type)
+                edges += 1
+    start = vert = min(steps)
+    res = []
+    while True:
+        end, type = steps[vert]
+        res.append((vert, end, type))
+        vert = end
+        if vert == start:
+            break
+    return res if len(res) == edges else None
+
+
+def word_of(steps):  # 边界词,每个字母是(dx, dy, 边类型)
+    return [(b[0] - a[0], b[1] - a[1], type) for a, b, type in steps]
+
+
+def boundary_word(grid, cells):  # 沿边界逆时针走一圈的边界词;边界不止一圈时返回None
+    steps = boundary_steps(grid, cells)
+    return None if steps is None else word_of(steps)
+
+
+def joined_steps(steps, position, other, dx, dy):  # 形状和平移(dx, dy)后的other组成的拼块的边界,不是简单闭曲线时返回None
+    """ steps和other是两块的 boundary_steps,position是steps中每条边(起点, 终点) -> 下标。
+    两块的公共边在other中必须是连续的一段,拼块的边界就是两块各自去掉这一段后接起来,
+    接起来之后每个顶点只能经过一次(否则两块还在别处相接,中间围出了洞) """
+    moved = [((a[0] + dx, a[1] + dy), (b[0] + dx, b[1] + dy), type) for a, b, type in other]
+    shared = [(b, a) in position for a, b, type in moved]  # 在steps中有反向的同一条边
+    starts = [k for k in range(len(moved)) if shared[k] and not shared[k - 1]]
+    if len(starts) != 1:  # 没有公共边、公共边不连续或者other整个都是公共边
+        return None
+    r = starts[0]
+    m = shared.count(True)
+    last = moved[(r + m - 1) % len(moved)]
+    p = position[(last[1], last[0])]  # 公共段在steps中从这里开始,方向与other中相反
+    res = [steps[(p + m + k) % len(steps)] for k in range(len(steps) - m)]
+    res += [moved[(r + m + k) % len(moved)] for k in range(len(moved) - m)]
+    if len({a for a, b, type in res}) != len(res):
+        return None
+    return res
+
+
+def is_bn_word(word):  # Beauquier-Nivat条件: 边界词(循环地)能写成 A B C Â B̂ Ĉ
+    """ X̂是把X反过来并且每个字母取反(方向相反,边类型相反),C可以为空(伪正方形)。
+    A和Â在边界上正好相对,从i开始长为l的段与从i+n/2开始的等长段互为反补时记为hat(i, l)。
+    同一个中心的反补段向两边同时扩展,所以每个中心只需要找出最长的一段(可容许因子),
+    hat(i, l)就是以它为中心的最长段至少长l。
+    简单闭曲线的边界词: 三段都不为空时A, B, C都是可容许因子(否则边界在两段之间原路折返),
+    C为空时总能把A向两边扩展到可容许因子。所以只需要从可容许因子开始找,最坏O(n^2),通常接近O(n) """
+    n = len(word)
+    if n % 2:
+        return False
+    half = n // 2
+    comp = [(-dx, -dy, -type) for dx, dy, type in word] * 2  # 反补的字母
+    word = word * 2  # 下标不超过2n,负的下标由Python循环回去
+    longest = [0] * (2 * n)  # 从i开始长为l的段的中心记为2i+l-1,每个中心的最长反补段的长度
+    for i in range(n):
+        j = i + half
+        if word[i] == comp[j]:  # 以i为中心,长为1
+            k, l = i, 1
+            while l + 2 <= half and word[k - 1] == comp[k + half + l] and word[k + l] == comp[k + half - 1]:
+                k, l = k - 1, l + 2
+            longest[2 * i] = l
+        if word[i] == comp[j + 1] and word[i + 1] == comp[j]:  # 以i和i+1之间为中心,长为2
+            k, l = i, 2
+            while l + 2 <= half and word[k - 1] == comp[k + half + l] and word[k + l] == comp[k + half - 1]:
+                k, l = k - 1, l + 2
+            longest[2 * i + 1] = l
+
+    def hat(i, l):
+        return l == 0 or longest[(2 * i + l - 1) % (2 * n)] >= l
+
+    factors = [[] for _ in range(n)]  # 起点 -> 从这里开始的可容许因子的长度
+    for center, l in enumerate(longest):
+        if l:
+            factors[(center - l + 1) // 2 % n].append(l)
+    for s in range(n):
+        for a in factors[s]:
+            if a < half and hat(s + a, half - a):  # C为空
+                return True
+            for b in factors[(s + a) % n]:
+                if a + b < half and hat(s + a + b, half - a - b):
+                    return True
+    return False
+
+
+def tiles(grid, cells, tiles, outside=None):  # 快速判定能否平铺平面(充分条件)
+    """ 形状本身,或者它和一个边匹配的相邻形状组成的拼块,边界词满足Beauquier-Nivat条件时
+    只用平移就能铺满平面(后者允许相邻的那一块旋转或翻转)。
+    cells是形状(格子 -> edgedata),tiles是所有方向的(格子, edgedata)列表。返回False不代表不能平铺。
+    形状和每个方向的边界只算一次,拼块的边界由两块的边界接起来 """
+    steps = boundary_steps(grid, cells)
+    if steps is not None and is_bn_word(word_of(steps)):
+        return True
+    table = placement_table(grid, tiles)
+    boundary = dict(grid.boundary(cells))
+    if steps is not None:
+        position = {(a, b): k for k, (a, b, type) in enumerate(steps)}
+        others = [boundary_steps(grid, dict(tile)) for tile in tiles]
+    seen = set()
+    for cell in grid.outside(cells) if outside is None else outside:
+        ox, oy = cell[0], cell[1]
+        shift = edge_shift(ox, oy)
+        for index, ax, ay, rel_cells, edges, signature in table[cell[2:]]:
+            placement = (index, ox - ax, oy - ay)
+            if placement in seen:
+                continue
+            seen.add(placement)
+            if any((x + ox, y + oy) + kind in cells for x, y, kind in rel_cells):  # 重叠
+                continue
+            if any(boundary.get(code + shift, need) != need for code, need in signature):  # 边不匹配
+                continue
+            if steps is not None:
+                joined = joined_steps(steps, position, others[index], placement[1], placement[2])
+            else:  # 形状本身的边界不是简单闭曲线时(例如在顶点相接),相邻的一块可能把它补成简单的,整个重新算
+                patch = dict(cells)
+                patch.update((grid.translate(tile_cell, placement[1], placement[2]), edgedata) for tile_cell, edgedata in tiles[index])
+                joined = boundary_steps(grid, patch)
+            if joined is not None and is_bn_word(word_of(joined)):
+                return True
+    return False
+
+
+# 逐层计算
+class HeeschSearch:
+    """ 一个形状的逐层计算,HShape、Shape 和 Polyform 的 heesch_computer 等都由这里完成。
+    shape只需要提供 polyform() 和 orientations()(见模块的说明),
+    结果中的形状是orientations()中的形状平移得到的,与shape的类型相同。
+    每一层的配置存在Frontier里(见frontier.py),只在输出时才重建形状 """
+
+    def __init__(self, shape, symmetry=False, dynamic=False, engine="search"):
+        self.form = shape.polyform()
+        self.grid = self.form.grid
+        self.cells = dict(self.form.cells)  # 中心形状: 格子 -> edgedata
+        self.outside = self.form.outside()  # 第1层的外部格子,priority在前
+        self.orientations = shape.orientations()
+        self.tiles = [orientation.polyform().cells for orientation in self.orientations]
+        self.symmetry, self.dynamic, self.engine = symmetry, dynamic, engine
+        self.deadline = None  # 截止时刻,由 heesch_computer(timeout=...) 设置
+
+    def shapes(self, levels):  # 中心形状和各层摆放中每个形状的(格子, edgedata)列表
+        return [self.form.cells] + [[(self.grid.translate(cell, dx, dy), edgedata) for cell, edgedata in self.tiles[index]]
+                                    for corona in levels for index, dx, dy in corona]
+
+    def patch(self, levels):  # 中心形状和各层摆放组成的拼块: 格子 -> edgedata
+        return {cell: edgedata for shape in self.shapes(levels) for cell, edgedata in shape}
+
+    def coronas(self, levels, counters=None):  # levels外面的一层冠状结构的摆放元组,第1层按self.outside的顺序
+        outside = None if levels else self.outside
+        return corona_placements(self.grid, self.patch(levels), self.tiles, outside, counters,
+                                 self.dynamic, self.symmetry, self.engine, self.deadline)
+
+    def witness(self, levels):  # 各层的摆放 -> 每层一个形状列表
+        return [[self.orientations[index].translate(dx, dy) for index, dx, dy in corona] for corona in levels]
+
+    def heesch_corona(self, frontier, workers=None, chunksize=None, start=0, next_frontier=None, on_expanded=None,
+                      metrics=None):  # 计算下一层
+        """ frontier是当前层的配置,返回下一层的Frontier,每个新配置只记父配置编号和新一层的摆放。
+        每个配置的扩展互不相关,workers>1时分块交给进程池并行计算,
+        同时最多有2 * workers块已提交但还没取回结果,任务数据不会一次全部放进内存。
+        进程之间只传递拼块的(格子, edgedata)和摆放元组,结果按frontier的顺序合并,与串行时完全相同。
+        从检查点恢复时跳过前start个配置并接着next_frontier往后加,
+        每个配置扩展完后调用on_expanded(下标, 摆放元组的列表)。
+        metrics不为None时各配置(包括其他进程中)的逐格计数合并到metrics里 """
+        next_frontier = frontier.child() if next_frontier is None else next_frontier
+        count = metrics is not None
+        tasks = ((tuple(self.patch(frontier.levels(i)).items()), count)
+                 for i in range(start, len(frontier)))  # 紧凑的任务数据: 拼块的格子
+        initargs = (self.grid.name, self.tiles, self.symmetry, self.dynamic, self.engine, self.deadline)
+        pool = None
+        if workers is None or workers <= 1:  # 串行,在当前进程里计算
+            _init_worker(*initargs)
+            results = map(_expand_config, tasks)
+        else:
+            if chunksize is None:  # 每个进程大约分到4块,兼顾负载均衡和通信开销,但一块不超过64个配置
+                chunksize = max(1, min(64, (len(frontier) - start) // (workers * 4)))
+            pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs)
+            results = _bounded_map(pool, tasks, chunksize, 2 * workers)
+        try:
+            for i, (placements, counters) in enumerate(results, start):
+                if count:
+                    metrics.add(counters)
+                for config in placements:  # 新配置共享父配置的各层,不复制
+                    next_frontier.append(i, config)
+                if on_expanded is not None:
+                    on_expanded(i, placements)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+        return next_frontier
+
+    def heesch_computer(self, workers=None, checkpoint=None, table=None, max_level=MAX_LEVEL, check_tiling=True,
+                        metrics=None, timeout=None, on_level=None):  # 逐层计算,返回能围到的最后一层的所有配置(每层一个形状列表)
+        """ checkpoint是检查点目录: 计算过程中定期写入,重新运行同一个形状时从上次的检查点继续。
+        每层的配置(包括第1层)先经过置换表table去重(默认新建一个),同一个拼块只扩展一次。
+        能平铺平面的形状每一层都有解,所以先用 tiles() 检查,能平铺时返回None;
+        max_level限制最多计算的层数(默认MAX_LEVEL,tiles()没识别出的平铺形状也能停下来),
+        达到时返回这一层的配置;max_level=None时不限层数。
+        metrics(见metrics.py)不为None时,每算完一层输出这一层的计数。
+        timeout是秒数: 搜索(包括进程池中的)超过后抛出SearchTimeout,带着已经算完的最后一层的配置,
+        检查点保留最后一次写入的状态。
+        on_level不为None时,每算完一层(包括从检查点恢复的那一层)调用on_level(见证),
+        见证是这一层第一个配置(每层一个形状列表),例如 PlotWriter.rewrite 在计算中途就写出结果 """
+        self.deadline = None if timeout is None else time.time() + timeout
+        if check_tiling and tiles(self.grid, self.cells, self.tiles, self.outside):
+            print(" The shape tiles the plane")
+            return None
+        table = TranspositionTable() if table is None else table
+        store = Checkpoint(checkpoint, self.form, self.orientations, self.symmetry, self.dynamic, self.engine) if checkpoint else None
+        state = store.load() if store else None
+        if state is not None:  # 从检查点恢复
+            i, frontier, start, partial = state
+        else:
+            started = time.perf_counter()
+            counters = {} if metrics is not None else None
+            frontier = Frontier(self.orientations)  # 每层的配置只存摆放,输出时才重建形状
+            try:
+                for config in self.coronas([], counters):
+                    frontier.append(-1, config)
+            except TimeoutError:
+                raise SearchTimeout([]) from None
+            if metrics is not None:
+                metrics.add(counters)
+                metrics.end_level(1, 1, len(frontier), time.perf_counter() - started)
+            frontier = table.dedupe(self, frontier)  # 第1层的配置在扩展之前也去重
+            print(f" transposition table: {table.hits} hits, {table.misses} misses")
+            i, start, partial = 0, 0, None
+            if store and len(frontier):
+                store.start_level(i, frontier)
+        if len(frontier) == 0:
+            return []
+        while True:
+            if on_level is not None:
+                on_level(self.witness(frontier.levels(0)))
+            if max_level is not None and i + 1 >= max_level:  # 达到层数上限
+                print(f" The heesch number is at least {i+1}")
+                if store:
+                    store.close()
+                return frontier.configs()
+            message = f"""
+            --------------------------------------
+            We are now computing the {i+2}nd corona
+            --------------------------------------
+            """
+            print(message)
+            started = time.perf_counter()
+            try:
+                new_frontier = self.heesch_corona(frontier, workers, start=start, next_frontier=partial,
+                                                  on_expanded=store.record if store else None, metrics=metrics)
+            except TimeoutError:
+                if store:
+                    store.close()
+                raise SearchTimeout(frontier.configs()) from None
+            if metrics is not None:  # 从检查点恢复时,这一层的计数只包括恢复之后扩展的配置
+                metrics.end_level(i + 2, len(frontier), len(new_frontier), time.perf_counter() - started)
+            if len(new_frontier) == 0:
+                print(f" The heesch number is {i+1}")
+                if store:
+                    store.close()
+                return frontier.configs()
+            frontier = table.dedupe(self, new_frontier)  # 去掉重复的拼块
+            print(f" transposition table: {table.hits} hits, {table.misses} misses")
+            i += 1
+            start, partial = 0, None
+            if store:
+                store.start_level(i, frontier)
+
+    def has_heesch_at_least(self, k):  # 判定Heesch数是否至少为k,找到第一个k层的拼块就返回
+        """ 深度优先地逐层往外围,不枚举全部冠状结构。每一层都覆盖里面拼块的全部外部格子,
+        所以见证与 heesch_computer() 的结果一样是合法的拼块。返回(True, 见证)或(False, None),
+        见证与 heesch_computer() 结果中的一个元素格式相同: 每层一个形状列表 """
+        if k <= 0:
+            return True, []
+
+        def search(levels):  # 在levels外面继续围,直到有k层
+            if len(levels) == k:
+                return levels
+            for config in self.coronas(levels):  # 逐个尝试这一层的冠状结构
+                found = search(levels + [config])
+                if found is not None:
+                    return found
+            return None
+
+        levels = search([])
+        return (True, self.witness(levels)) if levels is not None else (False, None)
+
+
+class SearchTimeout(TimeoutError):
+    """ heesch_computer(timeout=...) 超时: configs是已经算完的最后一层的所有配置,
+    第1层没有算完时为空列表,所以Heesch数至少为 len(configs[0]) (configs为空时为0) """
+
+    def __init__(self, configs):
+        super().__init__("heesch_computer passed its timeout")
+        self.configs = configs
+
+
+# 置换表
+class TranspositionTable:
+    """ 以拼块(中心形状加上所有冠状结构中的形状)为键,与形状的顺序和所在的层无关,
+    并且平移到最小x,y为0,同一个拼块只保留第一次出现的配置。
+    每一层都恰好覆盖里面拼块的外部格子,所以同一个中心的两个配置不会只是分层不同;
+    重复来自中心形状的对称变换: 把一个拼块整体变换后中心不变,再往外围的结果也只差这个变换,
+    所以键在中心的稳定子群下取最小的那个(与symmetry=True只保留代表的做法一致) """
+
+    def __init__(self):
+        self.seen = set()  # 已出现过的拼块的键
+        self.hits = 0  # 被去掉的重复配置数
+        self.misses = 0  # 新的拼块数
+
+    def key(self, shapes):  # 拼块的键: 每个形状排好序的(格子, edgedata),再排序,shapes是每个形状的(格子, edgedata)列表
+        xmin = min(cell[0] for shape in shapes for cell, edgedata in shape)  # 最小x坐标
+        ymin = min(cell[1] for shape in shapes for cell, edgedata in shape)  # 最小y坐标
+        return tuple(sorted(tuple(sorted(((cell[0] - xmin, cell[1] - ymin) + cell[2:], edgedata) for cell, edgedata in shape))
+                            for shape in shapes))
+
+    def canonical(self, grid, shapes, symmetries):  # 拼块在symmetries(中心形状的对称变换编号)下最小的键
+        return min(self.key([grid.transform(shape, symmetry) if symmetry else shape for shape in shapes])
+                   for symmetry in symmetries)
+
+    def dedupe(self, search, frontier):  # 去掉拼块已经出现过的配置,保持原来的顺序,返回新的Frontier
+        symmetries = [symmetry for symmetry, dx, dy in search.form.stabilizer()]
+        kept = []
+        for i in range(len(frontier)):
+            key = self.canonical(search.grid, search.shapes(frontier.levels(i)), symmetries)
+            if key in self.seen:
+                self.hits += 1
+            else:
+                self.seen.add(key)
+                self.misses += 1
+                kept.append(i)
+        return frontier.select(kept)
+
+
+""" 并行扩展用的进程函数 """
+
+_worker = None  # 每个进程只接收一次网格、所有方向和搜索选项
+
+
+def _init_worker(grid_name, tiles, symmetry, dynamic, engine, deadline):  # 进程池的初始化函数
+    global _worker
+    _worker = (grids[grid_name], tiles, symmetry, dynamic, engine, deadline)
+
+
+def _expand_config(task):  # 在进程中计算一个拼块外面的一层,返回(摆放元组的列表, 逐格计数或None)
+    cells, count = task
+    grid, tiles, symmetry, dynamic, engine, deadline = _worker
+    counters = {} if count else None
+    return list(corona_placements(grid, dict(cells), tiles, None, counters, dynamic, symmetry, engine, deadline)), counters
+
+
+def _expand_chunk(chunk):  # 在进程中依次计算一块配置
+    return [_expand_config(task) for task in chunk]
+
+
+def _bounded_map(pool, tasks, chunksize, window):  # 与 pool.map 相同,按顺序生成结果,但最多同时提交window块
+    tasks = iter(tasks)
+    pending = deque()  # 已提交的块,按提交的顺序
+    while True:
+        while len(pending) < window:
+            chunk = list(islice(tasks, chunksize))
+            if not chunk:
+                break
+            pending.append(pool.submit(_expand_chunk, chunk))
+        if not pending:
+            return
+        yield from pending.popleft().result()  # 取回最早的一块之后才补交新的块
+
+
+# 任意网格上的形状
+class Polyform:
+    def __init__(self, grid, cells, priority=()):  # cells为(格子, edgedata)的列表,priority是最先覆盖的外部格子
+        self.grid = grid
+        self.cells = [(tuple(cell), tuple(edgedata)) for cell, edgedata in cells]
+        self.priority = [tuple(cell) for cell in priority]
+
+    def to_data(self):  # 与 HShape.to_data 类似: 每个格子为[x, y, (种类,) edgedata]
+        return [list(cell) + [list(edgedata)] for cell, edgedata in self.cells]
+
+    def normal_form(self):  # 平移到最小x,y为0的位置后的格子集合,用于判等和哈希
+        xmin = min(cell[0] for cell, edgedata in self.cells)
+        ymin = min(cell[1] for cell, edgedata in self.cells)
+        return frozenset(((cell[0] - xmin, cell[1] - ymin) + cell[2:], edgedata) for cell, edgedata in self.cells)
+
+    def __eq__(self, other):  # 平移意义下相等
+        if not isinstance(other, Polyform):
+            return NotImplemented
+        return self.grid is other.grid and self.normal_form() == other.normal_form()
+
+    def __hash__(self):
+        return hash(self.normal_form())
+
+    def __len__(self):
+        return len(self.cells)
+
+    def polyform(self):  # HeeschSearch 需要的接口
+        return self
+
+    def translate(self, xval, yval):
+        grid = self.grid
+        return Polyform(grid, [(grid.translate(cell, xval, yval), edgedata) for cell, edgedata in self.cells],
+                        [grid.translate(cell, xval, yval) for cell in self.priority])
+
+    def transformed(self, symmetry):  # 第symmetry个对称变换的像(不保留priority)
+        return Polyform(self.grid, self.grid.transform(self.cells, symmetry))
+
+    def orientations(self):  # 所有不同的方向,顺序与grid.matrices一致
+        return unique([self.transformed(symmetry) for symmetry in range(len(self.grid.matrices))])
+
+    def stabilizer(self):  # 把形状映射到自身的对称变换(变换编号, dx, dy),第一个是恒等变换
+        symmetries = []
+        xmin = min(cell[0] for cell, edgedata in self.cells)
+        ymin = min(cell[1] for cell, edgedata in self.cells)
+        for symmetry in range(len(self.grid.matrices)):
+            image = self.transformed(symmetry)
+            if image == self:  # 平移意义下相等,平移量由最小坐标确定
+                dx = xmin - min(cell[0] for cell, edgedata in image.cells)
+                dy = ymin - min(cell[1] for cell, edgedata in image.cells)
+                symmetries.append((symmetry, dx, dy))
+        return symmetries
+
+    def outside(self):  # 与形状共用顶点的外部格子,priority在前
+        cells = dict(self.cells)
+        return [cell for cell in unique(self.priority + self.grid.outside(cells)) if cell not in cells]
+
+    def tiles(self):  # 快速判定能否平铺平面(充分条件),见 tiles()
+        return tiles(self.grid, dict(self.cells), [orientation.cells for orientation in self.orientations()], self.outside())
+
+    def corona_placements(self, base_orientations, symmetry=False, dynamic=True, engine="search", counters=None):  # 逐个生成冠状结构的摆放元组
+        """ base_orientations可以是任何提供 polyform() 的形状,参数见 corona_placements() """
+        tiles = [orientation.polyform().cells for orientation in base_orientations]
+        return corona_placements(self.grid, dict(self.cells), tiles, self.outside(), counters, dynamic, symmetry, engine)
+
+    def corona_iter(self, base_orientations, symmetry=False, dynamic=True, engine="search", counters=None):  # 逐个生成完整的冠状结构
+        for config in self.corona_placements(base_orientations, symmetry, dynamic, engine, counters):
+            yield [base_orientations[index].translate(dx, dy) for index, dx, dy in config]
+
+    def heesch_computer(self, symmetry=False, workers=None, checkpoint=None, table=None, dynamic=True, engine="search",
+                        max_level=MAX_LEVEL, check_tiling=True, metrics=None, timeout=None, on_level=None):  # 计算Heesch数,见 HeeschSearch.heesch_computer
+        search = HeeschSearch(self, symmetry, dynamic, engine)
+        return search.heesch_computer(workers, checkpoint, table, max_level, check_tiling, metrics, timeout, on_level)
+
+    def has_heesch_at_least(self, k, symmetry=False, dynamic=True, engine="search"):  # 见 HeeschSearch.has_heesch_at_least
+        return HeeschSearch(self, symmetry, dynamic, engine).has_heesch_at_least(k)
+
+
+def polyform_from_data(grid, data):  # Polyform.to_data 的逆
+    return Polyform(grid, [(tuple(item[:-1]), item[-1]) for item in data])
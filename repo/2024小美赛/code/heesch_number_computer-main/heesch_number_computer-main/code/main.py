@@ -4,39 +4,32 @@ from hexshapes import Hexagon, HShape  # 从hexshapes模块导入Hexagon和HShap
 from shapes import hexagon_maker as hexmaker  # 从shapes模块导入hexagon_maker函数并重命名为hexmaker
 from shapes import triangle_of_hexes as toh  # 从shapes模块导入triangle_of_hexes函数并重命名为toh
 from hexshapes import bighex_maker as bhmaker  # 从hexshapes模块导入bighex_maker函数并重命名为bhmaker
+from heeschsat import heesch_number  # 用SAT求解器计算Heesch数
+from plotfile import PlotWriter  # 结果文件的写入
 import time  # 导入time模块用于计时
 
-# 定义数据写入函数,接收基础形状和类型参数
-def data_writer(base, type = "corona"):
-    with open('./plotlist.txt', 'w') as file:  # 打开文件用于写入
+# 定义数据写入函数,接收基础形状和类型参数,engine为"enumerate"(逐个枚举)或"sat"(SAT求解)
+def data_writer(base, type = "corona", engine = "enumerate"):  # 结果写入plotlist.bin,格式见plotfile.py
+    with PlotWriter('./plotlist.bin', type, base) as writer:  # 先写文件头,之后逐层追加摆放记录
         if type == "heesch":  # 如果类型是heesch
-            coronalist = base.heesch_computer()[0]  # 计算Heesch数据
-            coronadata = []  # 初始化corona数据列表
-            for corona_config in coronalist:  # 遍历每个corona配置
-                coronadata.append([shape.to_data() for shape in corona_config])  # 将形状数据添加到列表
-            datadict = {"type": type, "num": len(coronalist), "data": {"base": base.to_data(), "heesch": coronadata}}  # 创建数据字典
+            if engine == "sat":  # SAT只给出一个最深的冠状结构作为见证
+                if base.tiles():  # 能平铺的形状每一层都有解,逐层加深不会停下来
+                    print(" The shape tiles the plane")
+                else:
+                    heesch_number(base, on_level=writer.rewrite)  # 最多算到 lattice.MAX_LEVEL 层
+            else:
+                base.heesch_computer(on_level=writer.rewrite)  # 每算完一层就把最深的见证写进文件,计算中途main2.py也能画
 
         elif type == "corona2":  # 如果类型是corona2
-            coronalist = base.second_corona()[0]  # 计算第二corona数据
-            first_data = []  # 初始化第一层数据列表
-            for shape in coronalist["first"]:  # 遍历第一层形状
-                first_data.append(shape.to_data())  # 添加形状数据
-            second_data = []  # 初始化第二层数据列表
-            for shape in coronalist["second"][0]:  # 遍历第二层形状
-                second_data.append(shape.to_data())  # 添加形状数据
-            datadict = {"type": type, "data": {"base": base.to_data(), "first": first_data, "second": second_data}}  # 创建数据字典
+            coronalist = next(base.second_corona_iter())  # 只取第一个能围两层的结果,不必枚举全部
+            writer.write_corona(1, coronalist["first"])  # 第一层
+            writer.write_corona(2, coronalist["second"][0])  # 第二层
 
         elif type == "corona":  # 如果类型是corona
-            coronalist = base.corona_maker(base.orientations())[0]  # 计算corona数据
-            corona_data = []  # 初始化corona数据列表
-            for shape in coronalist:  # 遍历每个形状
-                corona_data.append(shape.to_data())  # 添加形状数据
-            datadict = {"type": type, "data": {"base": base.to_data(), "corona": corona_data}}  # 创建数据字典
+            coronalist = next(base.corona_iter(base.orientations()))  # 只取第一个corona,不必枚举全部
+            writer.write_corona(1, coronalist)  # 写入这一层的所有形状
 
-        elif type == "base":  # 如果类型是base
-            datadict = {"type": type, "data": {"base": base.to_data()}}  # 创建只包含基础形状的数据字典
-
-        file.write(str(datadict))  # 将数据字典写入文件
+        # type == "base" 时只有文件头
 
 start_time = time.time()  # 记录开始时间
 
@@ -52,7 +45,7 @@ start_time = time.time()  # 记录开始时间
 # S1 = HShape([Hexagon(0,0, [1, 1, 1, 0, -1, -1])])  # 创建带边数据的六边形
 
 """4hex H2
-takes too long"""  # 4个六边形的H2形状注释(计算时间太长)
+computes in 35 sec, 2.3 sec with dynamic=True"""  # 4个六边形的H2形状注释(固定顺序约35秒,dynamic=True约2.3秒,engine = "sat"约3秒)
 
 # priority = [  # 优先级列表
 # Hexagon(-1, 1),  # 第一个优先六边形
@@ -69,7 +62,7 @@ takes too long"""  # 4个六边形的H2形状注释(计算时间太长)
 # )
 
 """3hex H2
-computes in 13 sec"""  # 3个六边形的H2形状注释(计算时间13秒)
+computes in 0.1 sec"""  # 3个六边形的H2形状注释(计算时间约0.1秒)
 
 # S1 = HShape(  # 创建H形状
 # [Hexagon(0, 0, [0, 0, 0, -1, 0, -1]),  # 第一个六边形
@@ -79,7 +72,7 @@ computes in 13 sec"""  # 3个六边形的H2形状注释(计算时间13秒)
 # )
 
 """ 2-hexapillar
-computes in 323 sec"""  # 2个六边形的柱状体注释(计算时间323秒)
+computes in 0.3 sec"""  # 2个六边形的柱状体注释(计算时间约0.3秒)
 S1 = HShape(  # 创建H形状
 [Hexagon(0, 0, [1, 1, 0, -1, -1, 0]),  # 第一个六边形
 Hexagon(2, 1, [1, 1, -1, -1, -1, 0])],  # 第二个六边形
@@ -1,85 +1,105 @@
-from hexshapes import Hexagon, HShape
-import ast
-import matplotlib.pyplot as plt
-from matplotlib.patches import RegularPolygon, Circle
+from plotfile import PlotFile, convert_legacy
+import os
+from matplotlib.collections import PolyCollection, LineCollection, EllipseCollection
+from matplotlib.colors import to_rgba
 
 import numpy as np
 
-def parametrization(el):
-    xcoord = el[0]-0.5 * el[1]
-    ycoord = 0.5*np.sqrt(3)*el[1]
-    return (xcoord, ycoord)
-
-def shapedrawer(shape, axes, color):
-    for hex in shape.hexes:
-        hexagon = RegularPolygon(parametrization(hex.origin), numVertices=6, orientation = 1/6 *np.pi ,radius= 1, alpha=1, color= color)
-        axes.add_patch(hexagon)
-        edgedata = hex.edgedata
-        for i in range(len(edgedata)):
-            if edgedata[i] == 1:
-                coord = parametrization(hex.origin)
-                coord = (coord[0]+2/3*np.cos(i*1/6*2*np.pi-1/2*np.pi), coord[1]+2/3*np.sin(i*1/6*2*np.pi-1/2*np.pi))
-                circle = Circle(coord, radius = 1/16, color="k")
-                axes.add_patch(circle)
-            elif edgedata[i] == -1:
-                coord = parametrization(hex.origin)
-                coord = (coord[0]+2/3*np.cos(i*1/6*2*np.pi-1/2*np.pi), coord[1]+2/3*np.sin(i*1/6*2*np.pi-1/2*np.pi))
-                circle = Circle(coord, radius = 1/16, color="w")
-                axes.add_patch(circle)
-with open('./plotlist.txt', 'r') as text:
-    data = ast.literal_eval(text.readline())
-
-axs = plt.subplot()
-plottinglist = []
-if data["type"] == "base":
-    base = HShape( [Hexagon(*elem) for elem in data["data"]["base"]])
-    shapedrawer(base, axs, "thistle")
-    plottinglist.extend(base.plot_data("blue"))
-
-elif data["type"] == "corona":
-    config = data["data"]["corona"]
-    for pre_shape in config:
-        shape = HShape( [Hexagon(*elem) for elem in pre_shape] )
-        shapedrawer(shape, axs, "lightseagreen")
-        plottinglist.extend(shape.plot_data("red"))
-    base = HShape( [Hexagon(*elem) for elem in data["data"]["base"]])
-    shapedrawer(base, axs, "turquoise")
-    plottinglist.extend(base.plot_data("blue"))
-
-elif data["type"] == "heesch":
-    heesch_data = data["data"]["heesch"]
-    for index in range(len(heesch_data)):
-        corona = heesch_data[index]
-        for pre_shape in corona:
-            shape = HShape( [Hexagon(*elem) for elem in pre_shape] )
-            color = "lightseagreen" if index%2 == 0 else "aquamarine"
-            shapedrawer(shape, axs, color)
-            plottinglist.extend(shape.plot_data("blue"))
-
-    base = HShape( [Hexagon(*elem) for elem in data["data"]["base"]])
-    shapedrawer(base, axs, "aquamarine")
-    plottinglist.extend(base.plot_data("blue"))
-
-elif data["type"] == "corona2":
-    first = data["data"]["first"]
-    for pre_shape in first:
-        shape = HShape( [Hexagon(*elem) for elem in pre_shape] )
-        shapedrawer(shape, axs, "lightseagreen")
-        plottinglist.extend(shape.plot_data("red"))
-
-    second = data["data"]["second"]
-    for pre_shape in second:
-        shape = HShape( [Hexagon(*elem) for elem in pre_shape] )
-        shapedrawer(shape, axs, "turquoise")
-        plottinglist.extend(shape.plot_data("blue"))
-
-    base = HShape( [Hexagon(*elem) for elem in data["data"]["base"]])
-    shapedrawer(base, axs, "aquamarine")
-    plottinglist.extend(base.plot_data("k"))
-
-
-axs.plot(*(plottinglist), linewidth=0.3)
-plt.autoscale(enable = True)
-axs.set_aspect("equal")
-plt.axis('off')
-plt.show()
+
+""" 画出 main.py 写的结果文件
+
+所有六边形一次性用numpy算出顶点坐标,整个图只用三个collection:
+填充是一个PolyCollection,形状的边界是一个LineCollection,边的标记是一个EllipseCollection,
+所以画图的时间主要花在光栅化上,而不是逐个创建matplotlib对象。 """
+
+
+SKEW = np.array([[1.0, 0.0], [-0.5, 0.5 * np.sqrt(3)]])  # 格子坐标(x, y) -> 平面坐标(x - y/2, √3/2 y),右乘
+CORNERS = np.array([(-1, -1), (0, -1), (1, 0), (1, 1), (0, 1), (-1, 0)])  # 六个顶点相对中心的格子坐标,与Hexagon.verts相同
+MARKS = 2 / 3 * np.array([(np.cos(i * np.pi / 3 - np.pi / 2), np.sin(i * np.pi / 3 - np.pi / 2))
+                          for i in range(6)])  # 第i条边的标记相对中心的平面坐标
+
+
+def colors(type, level):  # 第level层形状(0为中心形状)的填充色和边的颜色,没有则为None
+    if type == "base":
+        return ("thistle", "blue") if level == 0 else None
+    if type == "corona":
+        return {0: ("turquoise", "blue"), 1: ("lightseagreen", "red")}.get(level)
+    if type == "heesch":
+        if level == 0:
+            return "aquamarine", "blue"
+        return ("lightseagreen" if level % 2 == 1 else "aquamarine"), "blue"
+    if type == "corona2":
+        return {0: ("aquamarine", "k"), 1: ("lightseagreen", "red"), 2: ("turquoise", "blue")}.get(level)
+    return None
+
+
+def layers(data):  # [(层数, 六边形中心 (n, k, 2), 边的类型 (n, k, 6))],各层在前,中心形状(第0层)最后
+    origins = np.array([[hex.origin for hex in orientation.hexes] for orientation in data.orientations], dtype=np.int64)
+    edgedata = np.array([[hex.edgedata for hex in orientation.hexes] for orientation in data.orientations], dtype=np.int8)
+    records = np.frombuffer(data.records(), dtype="<i4").reshape(-1, 4)
+    res = []
+    for level in np.unique(records[:, 0]):
+        rows = records[records[:, 0] == level]
+        res.append((int(level), origins[rows[:, 1]] + rows[:, None, 2:4], edgedata[rows[:, 1]]))
+    base = data.base
+    res.append((0, np.array([[hex.origin for hex in base.hexes]], dtype=np.int64),
+                np.array([[hex.edgedata for hex in base.hexes]], dtype=np.int8)))
+    return res
+
+
+def geometry(centers, edgedata):  # 一层形状的六边形顶点,边界线段和标记,都是平面坐标
+    n, k = centers.shape[:2]
+    corners = centers[:, :, None, :] + CORNERS  # (n, k, 6, 2)
+    ends = np.roll(corners, -1, axis=2)  # 每条边的终点
+    # 同一个形状里被两个六边形共用的边不是边界: 用边的中点(的2倍)和形状编号识别同一条边
+    keys = np.concatenate([np.broadcast_to(np.arange(n)[:, None, None, None], (n, k, 6, 1)), corners + ends], axis=3)
+    _, inverse, counts = np.unique(keys.reshape(-1, 3), axis=0, return_inverse=True, return_counts=True)
+    boundary = counts[inverse.reshape(-1)] == 1
+    segments = np.stack([corners, ends], axis=3).reshape(-1, 2, 2)[boundary]
+    marked = edgedata.reshape(-1, 6) != 0
+    hexes = centers.reshape(-1, 2) @ SKEW
+    points = (hexes[:, None, :] + MARKS)[marked]
+    signs = edgedata.reshape(-1, 6)[marked]
+    return (corners.reshape(-1, 6, 2) @ SKEW, segments @ SKEW, points, signs)
+
+
+def render(axes, data, linewidth=0.3):  # 在axes上画出结果文件data(PlotFile)
+    polygons, fills, segments, lines, points, signs = [], [], [], [], [], []
+    for level, centers, edgedata in layers(data):
+        style = colors(data.type, level)
+        if style is None or centers.size == 0:
+            continue
+        hexes, edges, marks, marksigns = geometry(centers, edgedata)
+        polygons.append(hexes)
+        fills.append(np.broadcast_to(to_rgba(style[0]), (len(hexes), 4)))
+        segments.append(edges)
+        lines.append(np.broadcast_to(to_rgba(style[1]), (len(edges), 4)))
+        points.append(marks)
+        signs.append(marksigns)
+    if not polygons:
+        return
+    fills = np.concatenate(fills)
+    # 与原来逐个画的RegularPolygon一样,边框用填充色描一遍,相邻六边形之间不留缝
+    axes.add_collection(PolyCollection(np.concatenate(polygons), facecolors=fills, edgecolors=fills))
+    points, signs = np.concatenate(points), np.concatenate(signs)
+    if len(points):
+        marks = np.where(signs[:, None] == 1, to_rgba("k"), to_rgba("w"))  # 1为黑点,-1为白点
+        # requirements.txt固定matplotlib 3.4.1,那里只有transOffset(offset_transform是3.6才加的名字)
+        axes.add_collection(EllipseCollection(1 / 8, 1 / 8, 0, units="xy", offsets=points,
+                                              transOffset=axes.transData, facecolors=marks, edgecolors=marks))
+    axes.add_collection(LineCollection(np.concatenate(segments), colors=np.concatenate(lines),
+                                       linewidths=linewidth, zorder=2))
+    axes.autoscale_view()
+    axes.set_aspect("equal")
+    axes.axis('off')
+
+
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    if not os.path.exists('./plotlist.bin') and os.path.exists('./plotlist.txt'):  # 旧格式的结果先转换
+        convert_legacy('./plotlist.txt', './plotlist.bin')
+    axs = plt.subplot()
+    with PlotFile('./plotlist.bin') as data:  # 内存映射读取,整层的记录直接交给numpy
+        render(axs, data)
+    plt.show()
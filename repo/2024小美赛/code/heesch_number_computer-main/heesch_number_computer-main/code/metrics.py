@@ -0,0 +1,70 @@
+import json  # JSON行格式的输出
+
+
+""" 冠状结构搜索的计数器
+
+搜索时对每个外部格子累加六个计数(顺序见FIELDS):
+    1) frontier: 扩展到这个格子的部分配置数
+    2) candidates: 尝试的摆放数
+    3) overlap: 因为与已有形状重叠被拒绝的摆放数
+    4) edge: 因为边的类型不匹配被拒绝的摆放数
+    5) accepted: 合法的摆放数
+    6) seconds: 生成这些摆放用的时间
+每次尝试恰好有一个结果,所以 candidates = overlap + edge + accepted。
+每层结束时 Metrics.end_level 把这一层每个格子的计数和整层的汇总交给sink,sink是接收字典的函数,
+例如 JsonLinesSink 把每个事件写成一行JSON。不传metrics(默认)时搜索不做任何统计,没有额外开销。
+用法:
+    with JsonLinesSink("metrics.jsonl") as sink:
+        shape.heesch_computer(metrics=Metrics(sink)) """
+
+
+FIELDS = ("frontier", "candidates", "overlap", "edge", "accepted", "seconds")
+
+
+def new_counts():  # 一个格子的计数,顺序与FIELDS一致
+    return [0, 0, 0, 0, 0, 0.0]
+
+
+class Metrics:
+    def __init__(self, sink):
+        self.sink = sink  # 接收事件字典的函数
+        self.cells = {}  # 当前层: 格子 -> 计数
+
+    def add(self, counters):  # 合并一次搜索的逐格计数(可以来自其他进程)
+        for cell, counts in counters.items():
+            total = self.cells.get(cell)
+            if total is None:
+                self.cells[cell] = list(counts)
+            else:
+                for k, value in enumerate(counts):
+                    total[k] += value
+
+    def end_level(self, level, configs, next_configs, seconds):  # 第level层算完: 输出逐格计数和整层汇总,然后清零
+        totals = new_counts()
+        for cell, counts in sorted(self.cells.items()):
+            self.sink(dict(event="cell", level=level, cell=list(cell), **dict(zip(FIELDS, counts))))
+            for k, value in enumerate(counts):
+                totals[k] += value
+        self.sink(dict(event="level", level=level, configs=configs, next=next_configs, wall=seconds,
+                       **dict(zip(FIELDS, totals))))
+        self.cells = {}
+
+
+class JsonLinesSink:
+    """ 把事件逐行写成JSON,可以直接作为Metrics的sink """
+
+    def __init__(self, path):
+        self.file = open(path, "a")
+
+    def __call__(self, event):
+        self.file.write(json.dumps(event, separators=(",", ":")) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,153 @@
+import ast  # 读取旧的str(dict)格式
+import json  # 文件头使用JSON
+import mmap  # 读取时内存映射,不把整个文件读进内存
+import struct  # 定长整数记录
+
+from hexshapes import Hexagon, HShape  # 六边形形状
+
+
+""" main.py 写给 main2.py 的结果文件(plotlist.bin)
+
+文件由三部分组成,整数都是小端序:
+    1) 8字节的魔数 b"HEESCH" + 版本号(2字节)
+    2) 4字节的文件头长度,然后是JSON文件头(补齐到4字节的倍数):
+       {"type": 数据类型, "base": 中心形状, "orientations": 所有方向},形状都是 to_data() 的形式
+    3) 任意多条16字节的摆放记录(层数, 方向编号, dx, dy),各为int32
+每个形状只记为一条定长记录: 第level层的一个形状是 orientations[方向编号] 平移(dx, dy),
+平移量按最小x,y坐标计算。记录逐层追加写入,每写完一层就flush,所以计算中途文件也是完整可读的;
+heesch_computer的见证每算完一层都可能换一个,这时用 PlotWriter.rewrite 把文件头之后的记录整个换掉
+(文件会被截断,正在读的 PlotFile 要重新打开)。
+旧的 plotlist.txt 可以用 convert_legacy 转换: python plotfile.py plotlist.txt plotlist.bin """
+
+
+MAGIC = b"HEESCH\x00\x01"  # 魔数和版本号
+RECORD = struct.Struct("<4i")  # 一条摆放记录: (层数, 方向编号, dx, dy)
+LENGTH = struct.Struct("<I")  # 文件头长度
+
+
+def _corner(shape):  # 形状的最小x,y坐标,作为平移的参考点
+    return (min(hex.origin[0] for hex in shape.hexes), min(hex.origin[1] for hex in shape.hexes))
+
+
+def _shape_from_data(data):  # to_data() 的逆
+    return HShape([Hexagon(x, y, edgedata) for x, y, edgedata in data])
+
+
+class PlotWriter:
+    """ 逐个追加摆放记录,用法:
+        with PlotWriter("plotlist.bin", "heesch", base) as writer:
+            writer.write_corona(1, corona) """
+
+    def __init__(self, path, type, base, orientations=None):
+        self.orientations = base.orientations() if orientations is None else orientations
+        self.index = {orientation.normal_form(): i for i, orientation in enumerate(self.orientations)}  # 形状 -> 方向编号
+        self.corners = [_corner(orientation) for orientation in self.orientations]
+        header = json.dumps({"type": type, "base": base.to_data(),
+                             "orientations": [orientation.to_data() for orientation in self.orientations]},
+                            separators=(",", ":")).encode()
+        header += b" " * (-len(header) % 4)  # 补齐,使记录按4字节对齐
+        self.file = open(path, "wb")
+        self.file.write(MAGIC + LENGTH.pack(len(header)) + header)
+        self.file.flush()
+        self.start = self.file.tell()  # 第一条记录的位置
+
+    def write(self, level, shape):  # 写入第level层的一个形状
+        index = self.index.get(shape.normal_form())
+        if index is None:
+            raise ValueError("shape is not an orientation of the base shape")
+        (x, y), (x0, y0) = _corner(shape), self.corners[index]
+        self.file.write(RECORD.pack(level, index, x - x0, y - y0))
+
+    def write_corona(self, level, corona):  # 写入一整层并flush,读者随时可以看到完整的层
+        for shape in corona:
+            self.write(level, shape)
+        self.file.flush()
+
+    def rewrite(self, coronas):  # 把已写的记录换成coronas(每层一个形状列表),可以直接作为 heesch_computer 的on_level
+        self.file.seek(self.start)
+        self.file.truncate()
+        for level, corona in enumerate(coronas, 1):
+            self.write_corona(level, corona)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PlotFile:
+    """ 内存映射读取结果文件,记录按需解码 """
+
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a heesch result file")
+        length, = LENGTH.unpack_from(self.map, len(MAGIC))
+        start = len(MAGIC) + LENGTH.size
+        header = json.loads(self.map[start:start + length])
+        self.offset = start + length  # 第一条记录的位置
+        self.type = header["type"]
+        self.base = _shape_from_data(header["base"])
+        self.orientations = [_shape_from_data(data) for data in header["orientations"]]
+        self.corners = [_corner(orientation) for orientation in self.orientations]
+
+    def __len__(self):  # 完整记录的条数(写到一半的记录不算)
+        return (len(self.map) - self.offset) // RECORD.size
+
+    def records(self):  # 所有记录的缓冲区(只读,不复制),可以直接交给 numpy.frombuffer
+        return memoryview(self.map)[self.offset:self.offset + len(self) * RECORD.size]
+
+    def placements(self):  # 逐条生成(层数, 方向编号, dx, dy)
+        return RECORD.iter_unpack(self.records())
+
+    def shapes(self):  # 逐个生成(层数, 形状)
+        for level, index, dx, dy in self.placements():
+            yield level, self.orientations[index].translate(dx, dy)
+
+    def coronas(self):  # 按层分组的形状列表,第k个元素是第k+1层
+        coronas = []
+        for level, shape in self.shapes():
+            while len(coronas) < level:
+                coronas.append([])
+            coronas[level - 1].append(shape)
+        return coronas
+
+    def close(self):
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def convert_legacy(source, target):  # 把旧的str(dict)格式的plotlist.txt转换成新格式
+    with open(source) as text:
+        line = text.readline()
+    if not line.strip():
+        raise ValueError(f"{source} is empty")
+    data = ast.literal_eval(line)
+    type = data["type"]
+    base = _shape_from_data(data["data"]["base"])
+    if type == "heesch":
+        coronas = data["data"]["heesch"]
+    elif type == "corona":
+        coronas = [data["data"]["corona"]]
+    elif type == "corona2":
+        coronas = [data["data"]["first"], data["data"]["second"]]
+    else:
+        coronas = []
+    with PlotWriter(target, type, base) as writer:
+        for level, corona in enumerate(coronas, 1):
+            writer.write_corona(level, [_shape_from_data(shape) for shape in corona])
+
+
+if __name__ == "__main__":
+    import sys
+    convert_legacy(*sys.argv[1:3])
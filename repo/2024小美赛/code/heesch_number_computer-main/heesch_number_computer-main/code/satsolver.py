@@ -0,0 +1,314 @@
+import heapq  # 变量活跃度的优先队列
+import os  # 删除临时文件
+import subprocess  # 调用外部求解器
+import tempfile  # 外部求解器的DIMACS输入文件
+import time  # 截止时间
+
+
+""" SAT求解器接口
+
+子句用整数列表表示(DIMACS风格): 正数k表示变量k为真,负数-k表示变量k为假,变量从1开始编号。
+solve(num_vars, clauses) 可满足时返回模型列表model(model[k]为变量k的取值,model[0]不用),
+不可满足时返回None。heeschsat.py 只依赖这个接口,所以可以换成任何别的求解器。 """
+
+
+class Solver:
+    def solve(self, num_vars, clauses):  # 子类实现具体的求解
+        raise NotImplementedError
+
+
+# 纯Python的CDCL求解器
+class CDCLSolver(Solver):
+    """ 双文字监视的单元传播, 1UIP冲突学习和非时序回溯, VSIDS变量选择,
+    相位保存, Luby重启以及按长度删除学习子句, 不依赖任何外部程序 """
+
+    def __init__(self, restart_base=64, var_decay=0.95, max_conflicts=None, deadline=None):
+        self.restart_base = restart_base  # Luby重启序列的单位冲突数
+        self.var_decay = var_decay  # 变量活跃度的衰减系数
+        self.max_conflicts = max_conflicts  # 冲突数上限,超过后抛出TimeoutError,None表示不限制
+        self.deadline = deadline  # time.time() 的截止时刻,每次冲突时检查,超过后抛出TimeoutError
+        self.conflicts = 0  # 上一次求解的冲突数
+        self.decisions = 0  # 上一次求解的决策数
+
+    def solve(self, num_vars, clauses):
+        self.conflicts = 0
+        self.decisions = 0
+        # 文字编码: 变量v的正文字为2v,负文字为2v+1,取反即异或1
+        val = [0] * (2 * num_vars + 2)  # 文字的取值: 1真, -1假, 0未赋值
+        level = [0] * (num_vars + 1)  # 变量被赋值时的决策层
+        reason = [None] * (num_vars + 1)  # 变量被蕴含时的原因子句
+        watches = [[] for _ in range(2 * num_vars + 2)]  # 每个文字被哪些子句监视
+        activity = [0.0] * (num_vars + 1)  # VSIDS活跃度
+        polarity = [1] * (num_vars + 1)  # 保存的相位,默认取假(1表示负文字)
+        trail = []  # 赋值的先后顺序
+        trail_lim = []  # 每个决策层在trail中的起点
+        learnts = []  # 学习到的子句
+        var_inc = 1.0  # 活跃度增量
+        heap = [(0.0, v) for v in range(1, num_vars + 1)]  # (负活跃度, 变量)的惰性堆
+        seen = bytearray(num_vars + 1)  # 冲突分析时的标记
+
+        def assign(lit, clause):  # 把文字lit设为真
+            v = lit >> 1
+            val[lit] = 1
+            val[lit ^ 1] = -1
+            level[v] = len(trail_lim)
+            reason[v] = clause
+            trail.append(lit)
+
+        def propagate():  # 单元传播,返回冲突子句或None
+            qhead = propagate.qhead
+            while qhead < len(trail):
+                false_lit = trail[qhead] ^ 1
+                qhead += 1
+                ws = watches[false_lit]
+                i = j = 0
+                n = len(ws)
+                while i < n:
+                    c = ws[i]
+                    i += 1
+                    if not c:  # 已删除的学习子句,顺便从监视表里去掉
+                        continue
+                    if c[0] == false_lit:  # 保证c[1]是变假的那个监视文字
+                        c[0] = c[1]
+                        c[1] = false_lit
+                    first = c[0]
+                    if val[first] == 1:  # 子句已满足
+                        ws[j] = c
+                        j += 1
+                        continue
+                    for k in range(2, len(c)):  # 寻找新的监视文字
+                        lit = c[k]
+                        if val[lit] != -1:
+                            c[1] = lit
+                            c[k] = false_lit
+                            watches[lit].append(c)
+                            break
+                    else:
+                        ws[j] = c
+                        j += 1
+                        if val[first] == -1:  # 冲突
+                            while i < n:
+                                ws[j] = ws[i]
+                                j += 1
+                                i += 1
+                            del ws[j:]
+                            propagate.qhead = len(trail)
+                            return c
+                        assign(first, c)  # 单元子句,蕴含c[0]
+                del ws[j:]
+            propagate.qhead = qhead
+            return None
+
+        def bump(v):  # 提高变量的活跃度
+            nonlocal var_inc
+            activity[v] += var_inc
+            if activity[v] > 1e100:  # 数值过大时整体缩小
+                for u in range(1, num_vars + 1):
+                    activity[u] *= 1e-100
+                var_inc *= 1e-100
+                heap[:] = [(-activity[u], u) for u in range(1, num_vars + 1) if val[2 * u] == 0]
+                heapq.heapify(heap)
+            elif val[2 * v] == 0:
+                heapq.heappush(heap, (-activity[v], v))
+
+        def analyze(conflict):  # 1UIP冲突分析,返回(学习子句, 回溯层)
+            learnt = [0]
+            path = 0
+            p = -1
+            index = len(trail) - 1
+            clause = conflict
+            current = len(trail_lim)
+            while True:
+                for q in (clause if p == -1 else clause[1:]):
+                    v = q >> 1
+                    if not seen[v] and level[v] > 0:
+                        seen[v] = 1
+                        bump(v)
+                        if level[v] >= current:
+                            path += 1
+                        else:
+                            learnt.append(q)
+                while not seen[trail[index] >> 1]:
+                    index -= 1
+                p = trail[index]
+                index -= 1
+                v = p >> 1
+                clause = reason[v]
+                seen[v] = 0
+                path -= 1
+                if path == 0:
+                    break
+            learnt[0] = p ^ 1
+            # 局部化简: 原因子句的其它文字都已在学习子句中(或在第0层)的文字是多余的
+            kept = [learnt[0]]
+            for q in learnt[1:]:
+                r = reason[q >> 1]
+                if r is None or any(not seen[x >> 1] and level[x >> 1] > 0 for x in r[1:]):
+                    kept.append(q)
+            for q in learnt[1:]:
+                seen[q >> 1] = 0
+            learnt = kept
+            if len(learnt) == 1:
+                return learnt, 0
+            best = 1  # 把层数最高的文字放到第二位作为监视文字
+            for k in range(2, len(learnt)):
+                if level[learnt[k] >> 1] > level[learnt[best] >> 1]:
+                    best = k
+            learnt[1], learnt[best] = learnt[best], learnt[1]
+            return learnt, level[learnt[1] >> 1]
+
+        def backtrack(target):  # 回溯到第target层
+            if len(trail_lim) <= target:
+                return
+            start = trail_lim[target]
+            for k in range(len(trail) - 1, start - 1, -1):
+                lit = trail[k]
+                v = lit >> 1
+                val[lit] = 0
+                val[lit ^ 1] = 0
+                reason[v] = None
+                polarity[v] = lit & 1
+                heapq.heappush(heap, (-activity[v], v))
+            del trail[start:]
+            del trail_lim[target:]
+            propagate.qhead = len(trail)
+
+        def pick():  # 选出活跃度最高的未赋值变量
+            while heap:
+                v = heapq.heappop(heap)[1]
+                if val[2 * v] == 0:
+                    return v
+            return 0
+
+        def reduce_learnts():  # 删除一半较长的学习子句(作为原因的子句除外)
+            learnts.sort(key=len)
+            keep = len(learnts) // 2
+            for c in learnts[keep:]:
+                v = c[0] >> 1
+                if len(c) > 2 and not (reason[v] is c and val[c[0]] == 1):
+                    c.clear()
+            learnts[:] = [c for c in learnts if c]
+
+        # 读入子句
+        propagate.qhead = 0
+        for clause in clauses:
+            lits = set()
+            for x in clause:
+                lits.add(2 * x if x > 0 else -2 * x + 1)
+            if any(lit ^ 1 in lits for lit in lits):  # 重言式
+                continue
+            lits = [lit for lit in lits if val[lit] != -1]  # 去掉第0层已为假的文字
+            if any(val[lit] == 1 for lit in lits):
+                continue
+            if not lits:
+                return None
+            if len(lits) == 1:
+                assign(lits[0], None)
+                if propagate() is not None:
+                    return None
+                continue
+            watches[lits[0]].append(lits)
+            watches[lits[1]].append(lits)
+        if propagate() is not None:
+            return None
+
+        max_learnts = max(len(clauses) // 3, 2000)  # 学习子句数量上限,逐渐放宽
+        restart = 0
+        while True:
+            budget = luby(restart) * self.restart_base  # 本轮重启前允许的冲突数
+            restart += 1
+            while budget > 0:
+                conflict = propagate()
+                if conflict is not None:
+                    self.conflicts += 1
+                    budget -= 1
+                    if not trail_lim:  # 第0层冲突,不可满足
+                        return None
+                    if self.max_conflicts is not None and self.conflicts > self.max_conflicts:
+                        raise TimeoutError(f"gave up after {self.conflicts} conflicts")
+                    if self.deadline is not None and time.time() > self.deadline:
+                        raise TimeoutError(f"passed the deadline after {self.conflicts} conflicts")
+                    learnt, back_level = analyze(conflict)
+                    backtrack(back_level)
+                    if len(learnt) == 1:
+                        assign(learnt[0], None)
+                    else:
+                        watches[learnt[0]].append(learnt)
+                        watches[learnt[1]].append(learnt)
+                        learnts.append(learnt)
+                        assign(learnt[0], learnt)
+                    var_inc /= self.var_decay
+                    continue
+                if len(learnts) - len(trail) > max_learnts:
+                    reduce_learnts()
+                    max_learnts = int(max_learnts * 1.1)
+                v = pick()
+                if v == 0:  # 所有变量都已赋值,得到模型
+                    model = [False] * (num_vars + 1)
+                    for u in range(1, num_vars + 1):
+                        model[u] = val[2 * u] == 1
+                    return model
+                self.decisions += 1
+                trail_lim.append(len(trail))
+                assign(2 * v + polarity[v], None)
+            backtrack(0)
+
+
+# 调用外部求解器
+class DimacsSolver(Solver):
+    """ 把问题写成DIMACS文件交给外部求解器(例如 minisat, kissat, cadical),
+    读取SAT竞赛格式的输出("s SATISFIABLE" 和 "v ..." 行) """
+
+    def __init__(self, command):
+        self.command = list(command)  # 求解器命令,DIMACS文件路径会追加在最后
+
+    def solve(self, num_vars, clauses):
+        with tempfile.NamedTemporaryFile("w", suffix=".cnf", delete=False) as file:
+            file.write(f"p cnf {num_vars} {len(clauses)}\n")
+            for clause in clauses:
+                file.write(" ".join(map(str, clause)) + " 0\n")
+            path = file.name
+        try:
+            result = subprocess.run(self.command + [path], capture_output=True, text=True)
+        finally:
+            os.remove(path)
+        model = [False] * (num_vars + 1)
+        satisfiable = None
+        for line in result.stdout.splitlines():
+            if line.startswith("s "):
+                satisfiable = line.split()[1] == "SATISFIABLE"
+            elif line.startswith("v "):
+                for x in map(int, line.split()[1:]):
+                    if x > 0:
+                        model[x] = True
+        if satisfiable is None:
+            raise RuntimeError(f"no result from {self.command[0]}: {result.stderr.strip()}")
+        return model if satisfiable else None
+
+
+def luby(i):  # Luby序列的第i项(从0开始): 1 1 2 1 1 2 4 1 1 2 ...
+    size, seq = 1, 0
+    while size < i + 1:
+        seq += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) >> 1
+        seq -= 1
+        i = i % size
+    return 2 ** seq
+
+
+def at_most_one(lits, new_var):  # 至多一个为真的约束,较长时用顺序计数器编码,new_var()分配辅助变量
+    if len(lits) <= 6:
+        return [[-a, -b] for k, a in enumerate(lits) for b in lits[k + 1:]]
+    clauses = []
+    prev = new_var()
+    clauses.append([-lits[0], prev])
+    for lit in lits[1:-1]:
+        cur = new_var()
+        clauses.append([-lit, cur])
+        clauses.append([-prev, cur])
+        clauses.append([-lit, -prev])
+        prev = cur
+    clauses.append([-lits[-1], -prev])
+    return clauses
@@ -1,4 +1,8 @@
+from collections import Counter
 from math import sqrt
+import time
+
+from lattice import MAX_LEVEL, TRIANGLE, HeeschSearch, Polyform, unique
 
 
 class Triangle:
@@ -7,6 +11,8 @@ class Triangle:
 
     def __init__(self, x, y, up = True, edgedata = [ 0, 0, 0 ]):
         self.up = up
+        self.key = (x, y, up)  # integer cell key, used for hashing and occupancy sets
+        self.edgedata = tuple(edgedata)
         self.v1, self.v2, self.v3 = ((x,y), (x+1,y), (x+1, y+1)) if self.up else ((x,y),(x+1,y),(x,y-1))
         self.edgedict = [{ "edge": {self.v1,self.v2}, "type": edgedata[0]},
                     {"edge": {self.v2, self.v3}, "type": edgedata[1]},
@@ -16,13 +22,16 @@ class Triangle:
     def translate(self, xval, yval):
         newx = self.v1[0] + xval
         newy = self.v1[1] + yval
-        return Triangle(newx,newy, up = self.up)
+        return Triangle(newx,newy, up = self.up, edgedata = self.edgedata)
 
     def __str__(self):
         return f"{self.v1}, {self.v2}, {self.v3}"
 
     def __eq__(self, other):
-        return(self.v1 == other.v1 and self.up == other.up)
+        return self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
 
     def common_edge(self, other):
         for edge in self.edges:
@@ -31,7 +40,9 @@ class Triangle:
                     return edge
 
     def flip(self):
-        return Triangle(-self.v1[0]+self.v1[1],self.v1[1], up=self.up)
+        # the mirror image keeps edge 0 and swaps edges 1 and 2
+        e = self.edgedata
+        return Triangle(-self.v1[0]+self.v1[1],self.v1[1], up=self.up, edgedata=(e[0], e[2], e[1]))
 
 
     def vertex_returner(self):
@@ -47,10 +58,11 @@ class Triangle:
         xmin = min([elem[0] for elem in new_vertex_list])
         ymin = min([elem[1] for elem in new_vertex_list])
         ymax = max([elem[1] for elem in new_vertex_list])
+        e = self.edgedata  # the edge types follow their edges to the new slots
         if not self.up:
-            return Triangle(xmin, ymin)
+            return Triangle(xmin, ymin, edgedata=(e[2], e[1], e[0]))
         else:
-            return Triangle(xmin, ymax, up=False)
+            return Triangle(xmin, ymax, up=False, edgedata=(e[1], e[0], e[2]))
 
 
     def plot_data(self, color= "b-"):
@@ -64,14 +76,21 @@ class Triangle:
 
 
 class Shape:
-    def __init__(self, triangles):
+    def __init__(self, triangles, edges=None):
         self.triangles = triangles
-        self.edges = self.edgemaker()
+        self._edges = edges  # boundary edges, computed on first use
 
     """ With these functions we instantiate some stuff"""
+    @property
+    def edges(self):
+        if self._edges is None:
+            self._edges = self.edgemaker()
+        return self._edges
+
     def edgemaker(self):
         total_edge_list = [edge for triangle in self.triangles for edge in triangle.edges]
-        total_edge_list = [edge for edge in total_edge_list if total_edge_list.count(edge) == 1]
+        edge_count = Counter(frozenset(edge) for edge in total_edge_list)  # linear instead of list.count
+        total_edge_list = [edge for edge in total_edge_list if edge_count[frozenset(edge)] == 1]
         return total_edge_list
 
     def vertmaker(self):
@@ -82,16 +101,24 @@ class Shape:
         # vertex_list = [elem for  elem in vertex_list if elem not in self.inside()]
         return vertex_list
 
+    def normal_form(self):
+        """ The triangles moved so that the smallest x and y are 0, as a set of
+        (x, y, up, edgedata). Two shapes are equal up to translation iff their
+        normal forms are equal """
+        xmin = min(triangle.v1[0] for triangle in self.triangles)
+        ymin = min(triangle.v1[1] for triangle in self.triangles)
+        return frozenset((x - xmin, y - ymin, up, triangle.edgedata) for triangle in self.triangles
+                         for x, y, up in (triangle.key,))
+
     def __eq__(self, other):
-        xmin_s = min([elem.v1[0] for elem in self.triangles])
-        ymin_s = min([elem.v1[1] for elem in self.triangles])
-        xmin_o = min([elem.v1[0] for elem in other.triangles])
-        ymin_o = min([elem.v1[1] for elem in other.triangles])
-        return all(triangle in other.translate(xmin_s-xmin_o,ymin_s-ymin_o).triangles for triangle in self.triangles)
+        return self.normal_form() == other.normal_form()
+
+    def __hash__(self):
+        return hash(self.normal_form())
 
 
     def copy(self):
-        return Shape(self.triangles)
+        return Shape(self.triangles, self._edges)
 
     def orientations(self):
         orientation_list =[
@@ -108,18 +135,17 @@ class Shape:
         self.flip().turn60().turn60().turn60().turn60(),
         self.flip().turn60().turn60().turn60().turn60().turn60(),
         ]
-        new_orientations_list = []
-        for orientation in orientation_list:
-            if orientation not in new_orientations_list:
-                new_orientations_list.append(orientation)
-        return new_orientations_list
+        return unique(orientation_list)
 
     """ With these functions we edit the shape"""
     def translate(self, xval, yval):
         new_triangles = []
         for triangle in self.triangles:
             new_triangles.append(triangle.translate(xval, yval))
-        return Shape(new_triangles)
+        new_edges = None
+        if self._edges is not None:  # shift the parent's boundary instead of recomputing it
+            new_edges = [{(x + xval, y + yval) for x, y in edge} for edge in self._edges]
+        return Shape(new_triangles, new_edges)
 
     def translate_rel(self, tri1, tri2):
         return self.translate(tri1.v1[0]-tri2.v1[0], tri1.v1[1]-tri2.v1[1])
@@ -137,74 +163,60 @@ class Shape:
         return Shape(new_triangles)
 
     def inside_remover(self):
-        inside_list = []
+        boundary = {frozenset(edge) for edge in self.edges}
+        inside_list = set()
         for triangle in self.triangles:
-            if all(edge not in self.edges for edge in triangle.edges):
-                inside_list.append(triangle)
+            if all(frozenset(edge) not in boundary for edge in triangle.edges):
+                inside_list.add(triangle)
         new_triangles = [elem for elem in self.triangles if elem not in inside_list]
         return new_triangles
 
     def outside(self):
-        hexlist = []
-        for vert in self.vertmaker():
-            hexlist.extend(hexagon_maker(vert[0]-1,vert[1]))
-        res = []
-        for elem in hexlist:
-            if elem not in res:
-                res.append(elem)
-        res = [elem for elem in res if elem not in self.triangles]
-        return res
-
-    def corona_maker(self, base_orientations, bookkeeping=False):
-        def not_occupied_in(elem, config):
-            config_triangles = []
-            for shape in config:
-                config_triangles.extend(shape.triangles)
-            return (elem not in config_triangles)
-
-
-        base_orientations_boundaries = [orientation.inside_remover() for orientation in base_orientations ]
-        bookkeeper = []
-        possible_config = []
-        outside_list = self.outside()
-        #print(f"the outside list length is {len(outside_list)}")
-        for i in range(len(outside_list)):
-            print(f" we are now at {int((i+1)/len(outside_list)*100)}% ")
-            elem = outside_list[i]
-            if len(possible_config) == 0:
-                #print("going through the zero loop")
-                for index in range(len(base_orientations)):
-                    for elem3 in [elem2 for elem2 in base_orientations_boundaries[index] if elem2.up == elem.up]:
-                        #print(elem.up, elem3.up)
-                        new_shape = base_orientations[index].translate_rel(elem, elem3)
-                        if all(triangle not in self.triangles for triangle in new_shape.triangles):
-                            possible_config.append([new_shape])
-                #print(" zero loop appending ")
-                if bookkeeping:
-                    bookkeeper.append(possible_config)
-
-            else:
-                new_possible_config = []
-                for config in possible_config:
-                    if not_occupied_in(elem, config):
-                        for index in range(len(base_orientations)):
-                            for elem3 in [elem2 for elem2 in base_orientations_boundaries[index] if elem2.up == elem.up]:
-                                new_shape = base_orientations[index].translate_rel(elem, elem3)
-                                if all(triangle not in self.triangles and not_occupied_in(triangle, config) for triangle in new_shape.triangles):
-                                    new_config = config.copy()
-                                    new_config.append(new_shape)
-                                    new_possible_config.append(new_config)
-                                else:
-                                    continue
-                    else:
-                        #print(f" its occupied in the config? ")
-                        new_possible_config.append(config)
-
-                possible_config = new_possible_config.copy()
-                #print(possible_config)
-                if bookkeeping:
-                    bookkeeper.append(possible_config)
-        return bookkeeper if bookkeeping else possible_config
+        # the triangles that share a vertex with the shape, as in lattice.Grid.outside
+        return [Triangle(x, y, up) for x, y, up in self.polyform().outside()]
+
+    def corona_maker(self, base_orientations, engine="search", metrics=None):
+        """ All coronas as lists of shapes, found by lattice.corona_placements
+        (engine="dlx" uses the Dancing Links exact cover in dlx.py instead).
+        If metrics (see metrics.py) is given, the per-triangle counters of the
+        search are reported to it as level 1 """
+        started = time.perf_counter()
+        counters = {} if metrics is not None and engine != "dlx" else None
+        coronas = list(self.corona_iter(base_orientations, engine=engine, counters=counters))
+        if metrics is not None:
+            metrics.add(counters or {})
+            metrics.end_level(1, 1, len(coronas), time.perf_counter() - started)
+        return coronas
+
+    def corona_placements(self, base_orientations, symmetry=False, dynamic=True, engine="search", counters=None):
+        """ Every corona as a tuple of placements (orientation index, dx, dy),
+        found by the exact cover search in lattice.py. Edges that meet must have
+        opposite types, as for hexagons """
+        return self.polyform().corona_placements(base_orientations, symmetry, dynamic, engine, counters)
+
+    def corona_iter(self, base_orientations, symmetry=False, dynamic=True, engine="search", counters=None):
+        for config in self.corona_placements(base_orientations, symmetry, dynamic, engine, counters):
+            yield [base_orientations[index].translate(dx, dy) for index, dx, dy in config]
+
+    def polyform(self):
+        return Polyform(TRIANGLE, [(triangle.key, triangle.edgedata) for triangle in self.triangles])
+
+    def tiles(self):
+        """ Sufficient test for tiling the plane, see lattice.tiles """
+        return self.polyform().tiles()
+
+    def heesch_computer(self, symmetry=False, workers=None, checkpoint=None, table=None, dynamic=True, engine="search",
+                        max_level=MAX_LEVEL, check_tiling=True, metrics=None, timeout=None, on_level=None):
+        """ Heesch number, computed level by level by lattice.HeeschSearch with
+        the same options as HShape.heesch_computer. Returns the configurations
+        of the last level that could be completed (one list of shapes per
+        corona), or None if the shape tiles the plane """
+        search = HeeschSearch(self, symmetry, dynamic, engine)
+        return search.heesch_computer(workers, checkpoint, table, max_level, check_tiling, metrics, timeout, on_level)
+
+    def has_heesch_at_least(self, k, symmetry=False, dynamic=True, engine="search"):
+        """ Depth first: returns (True, witness) as soon as k coronas fit, else (False, None) """
+        return HeeschSearch(self, symmetry, dynamic, engine).has_heesch_at_least(k)
 
     """ With these function we output a list to be put into a plot
     as input we specify the color we want the line to have
@@ -0,0 +1,246 @@
+import argparse  # 命令行参数
+import contextlib  # 任务中逐层的输出不打印
+import io  # 同上
+import itertools  # 枚举边的类型标记
+import json  # 形状和见证以JSON保存在数据库里
+import sqlite3  # 结果数据库
+import time  # 计时
+from concurrent.futures import ProcessPoolExecutor, as_completed  # 并行计算
+
+from hexshapes import Hexagon, HShape  # 六边形形状
+from heeschsat import corona_patch  # engine="sat"时用SAT计算Heesch数
+from lattice import HEX, Polyform, SearchTimeout, grids, polyform_from_data  # 任意网格上的形状
+from satsolver import CDCLSolver  # engine="sat"时的求解器,带截止时间
+
+
+""" 批量计算多格形的Heesch数
+
+    1) free_polyforms(grid, n): 用Redelmeier算法不重复地生成n个格子组成的所有自由多格形,
+       grid是 lattice.py 中的网格(六边形、三角形或正方形)
+    2) markings(shape): 给边界边加上-1, 0, 1的类型标记,在形状的对称变换下去重
+    3) Survey: 在进程池里逐个计算Heesch数(每个任务有超时),结果存进SQLite数据库,
+       已经算过的形状会被跳过,所以可以随时中断后继续,或者往已有的表里添加更大的n
+默认用深度优先的搜索(dynamic=True),engine="sat"时改用SAT,
+在main.py的形状上SAT比搜索慢得多,所以不作为默认。
+命令行: python survey.py 6 --workers 8 --db survey.db
+        python survey.py 8 --lattice square --max-level 4 """
+
+
+""" 多格形的枚举 """
+
+def normalized(cells):  # 平移到最小x,y为0并排序
+    xmin = min(cell[0] for cell in cells)
+    ymin = min(cell[1] for cell in cells)
+    return tuple(sorted((cell[0] - xmin, cell[1] - ymin) + cell[2:] for cell in cells))
+
+
+def cell_images(grid, cells):  # 格子集合在网格的所有对称变换下的像(已平移归一化)
+    blank = [(cell, ()) for cell in cells]
+    return [normalized([image for image, edgedata in grid.transform(blank, symmetry)])
+            for symmetry in range(len(grid.matrices))]
+
+
+def fixed_polyforms(grid, n):  # Redelmeier算法: 每个固定多格形(只允许平移)恰好生成一次
+    """ 以(y, x, 种类)最小的格子为原点,只往(y, x, 种类)更大的格子生长,每种格子分别作为一次原点。
+    untried是还可以加入的格子,一个格子在某一层试过之后就不会在更深的层再被加入 """
+    if n < 1:
+        return
+
+    def order(cell):
+        return (cell[1], cell[0]) + cell[2:]
+
+    for kind in grid.kinds:
+        root = (0, 0) + kind
+        cells = []  # 当前的多格形
+        seen = {root}  # 当前路径上进入过untried的格子
+
+        def grow(untried):
+            while untried:
+                cell = untried.pop()
+                cells.append(cell)
+                if len(cells) == n:
+                    yield tuple(cells)
+                else:
+                    new = [other for slot, other, other_slot in grid.neighbours(cell)]
+                    new = [other for other in new if order(other) > order(root) and other not in seen]
+                    seen.update(new)
+                    yield from grow(untried + new)
+                    seen.difference_update(new)
+                cells.pop()
+
+        yield from grow([root])
+
+
+def free_polyforms(grid, n):  # 自由多格形(允许旋转和翻转),每一类只保留规范形式最小的那个固定多格形
+    for cells in fixed_polyforms(grid, n):
+        own = normalized(cells)
+        if own == min(cell_images(grid, cells)):
+            yield Polyform(grid, [(cell, (0,) * len(grid.vertices(cell))) for cell in own])
+
+
+def fixed_polyhexes(n):
+    return fixed_polyforms(HEX, n)
+
+
+def free_polyhexes(n):  # 自由多六边形,与 free_polyforms(HEX, n) 相同,但生成HShape
+    for shape in free_polyforms(HEX, n):
+        yield HShape([Hexagon(x, y) for (x, y), edgedata in shape.cells])
+
+
+def markings(shape, types=(-1, 0, 1)):  # 边界边所有可能的类型标记,在形状的对称变换下去重
+    """ shape是 Polyform 或 HShape,生成的形状类型相同 """
+    hexes = isinstance(shape, HShape)
+    form = Polyform(HEX, [(hex.origin, hex.edgedata) for hex in shape.hexes]) if hexes else shape
+    grid = form.grid
+    cells = {cell: k for k, (cell, edgedata) in enumerate(form.cells)}
+    boundary = [(k, slot) for k, (cell, edgedata) in enumerate(form.cells) for slot, other, other_slot in grid.neighbours(cell)
+                if other not in cells]  # (格子下标, 边的下标)
+    own = form.normal_form()
+    group = [symmetry for symmetry in range(len(grid.matrices)) if form.transformed(symmetry).normal_form() == own]  # 把形状映到自身的变换,标记只需要在这些变换下去重
+    seen = set()
+    for marks in itertools.product(types, repeat=len(boundary)):
+        edgedata = [[0] * len(edgedata) for cell, edgedata in form.cells]  # 内部的边类型为0
+        for (k, slot), mark in zip(boundary, marks):
+            edgedata[k][slot] = mark
+        marked = [(cell, tuple(edgedata[k])) for k, (cell, old) in enumerate(form.cells)]
+        key = min(tuple(sorted(Polyform(grid, grid.transform(marked, symmetry)).normal_form())) for symmetry in group)
+        if key not in seen:
+            seen.add(key)
+            if hexes:
+                yield HShape([Hexagon(x, y, edgedata) for (x, y), edgedata in marked])
+            else:
+                yield Polyform(grid, marked)
+
+
+def canonical_key(shape):  # 形状在所有对称变换下的规范形式,作为数据库的主键
+    if isinstance(shape, HShape):
+        shape = Polyform(HEX, [(hex.origin, hex.edgedata) for hex in shape.hexes])
+    images = [tuple(sorted(shape.transformed(symmetry).normal_form())) for symmetry in range(len(shape.grid.matrices))]
+    return json.dumps([list(cell) + [list(edgedata)] for cell, edgedata in min(images)], separators=(",", ":"))
+
+
+""" 计算单个形状的Heesch数 """
+
+def heesch_job(task):  # 在进程中计算一个形状的Heesch数,返回要写入数据库的一行
+    """ 超时由搜索自己检查截止时间(见 lattice.corona_placements 和 CDCLSolver),不用信号,
+    所以在Windows上也能用。搜索引擎一次算到max_level层,SAT逐层加深 """
+    key, lattice, data, engine, max_level, timeout = task
+    if lattice == HEX.name:
+        shape = HShape([Hexagon(x, y, edgedata) for x, y, edgedata in data])
+    else:
+        shape = polyform_from_data(grids[lattice], data)
+    start = time.time()
+    heesch, patch, status = 0, [], "ok"
+    deadline = start + timeout if timeout else None
+    try:
+        if shape.tiles():
+            heesch, status = None, "tiles"
+        elif engine == "sat":
+            solver = CDCLSolver(deadline=deadline)
+            while heesch < max_level:  # 逐层加深直到无解
+                if deadline is not None and time.time() > deadline:  # 冲突很少的层不会在求解器里超时
+                    raise TimeoutError
+                coronas = corona_patch(shape, heesch + 1, solver)
+                if coronas is None:
+                    break
+                heesch, patch = heesch + 1, coronas
+            else:
+                status = "max_level"  # Heesch数至少为max_level(可能能平铺)
+        else:
+            with contextlib.redirect_stdout(io.StringIO()):  # 进度由Survey.run打印
+                configs = shape.heesch_computer(dynamic=True, max_level=max_level, check_tiling=False,
+                                                timeout=deadline - time.time() if deadline else None)
+            if configs:
+                heesch, patch = len(configs[0]), configs[0]
+            if heesch >= max_level:
+                status = "max_level"  # Heesch数至少为max_level(可能能平铺)
+    except SearchTimeout as error:  # Heesch数至少为已经算完的层数
+        status = "timeout"
+        if error.configs:
+            heesch, patch = len(error.configs[0]), error.configs[0]
+    except TimeoutError:
+        status = "timeout"  # Heesch数至少为heesch
+    witness = json.dumps([[elem.to_data() for elem in corona] for corona in patch], separators=(",", ":"))
+    return key, heesch, status, witness, time.time() - start
+
+
+""" 结果数据库 """
+
+class Survey:
+    def __init__(self, path="survey.db"):
+        self.db = sqlite3.connect(path)
+        self.db.execute("""CREATE TABLE IF NOT EXISTS results (
+            key TEXT PRIMARY KEY,  -- 规范形式
+            size INTEGER,          -- 格子个数
+            marked INTEGER,        -- 是否有边类型标记
+            shape TEXT,            -- 计算时使用的形状 to_data()
+            heesch INTEGER,        -- Heesch数(max_level和timeout时是下界,tiles时为空)
+            status TEXT,           -- ok, tiles, max_level 或 timeout
+            witness TEXT,          -- 最深的冠状结构,每层一个形状列表
+            seconds REAL,          -- 计算时间
+            engine TEXT,
+            lattice TEXT)          -- 网格: hex, triangle 或 square""")
+        if "lattice" not in [row[1] for row in self.db.execute("PRAGMA table_info(results)")]:  # 旧的数据库只有多六边形
+            self.db.execute("ALTER TABLE results ADD COLUMN lattice TEXT DEFAULT 'hex'")
+        self.db.execute("CREATE INDEX IF NOT EXISTS results_size ON results (size, marked, heesch)")
+        self.db.commit()
+
+    def known(self, key):  # 这个形状是否已经算过
+        return self.db.execute("SELECT 1 FROM results WHERE key = ?", (key,)).fetchone() is not None
+
+    def run(self, shapes, workers=None, timeout=60, max_level=6, engine="search"):  # 计算所有还没算过的形状
+        tasks, info = [], {}
+        for shape in shapes:
+            key = canonical_key(shape)
+            if key in info or self.known(key):
+                continue
+            lattice = HEX.name if isinstance(shape, HShape) else shape.grid.name
+            data = shape.to_data()
+            marked = any(any(item[-1]) for item in data)
+            info[key] = (len(data), int(marked), json.dumps(data, separators=(",", ":")), lattice)
+            tasks.append((key, lattice, data, engine, max_level, timeout))
+        print(f" survey: {len(tasks)} new shapes")
+        if workers is None or workers <= 1:
+            results = map(heesch_job, tasks)
+            pool = None
+        else:
+            pool = ProcessPoolExecutor(workers)
+            results = (future.result() for future in as_completed([pool.submit(heesch_job, task) for task in tasks]))
+        try:
+            for i, (key, heesch, status, witness, seconds) in enumerate(results):
+                size, marked, data, lattice = info[key]
+                self.db.execute("INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                (key, size, marked, data, heesch, status, witness, seconds, engine, lattice))
+                self.db.commit()  # 每个结果立即写入,中断后不会丢失
+                print(f" survey: {i+1}/{len(tasks)} heesch {heesch} ({status}, {seconds:.1f} s)")
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    def table(self, marked=False, lattice=HEX.name):  # 分类表: (格子个数, Heesch数, 状态, 形状数)
+        return self.db.execute("""SELECT size, heesch, status, COUNT(*) FROM results WHERE marked = ? AND lattice = ?
+            GROUP BY size, heesch, status ORDER BY size, heesch, status""", (int(marked), lattice)).fetchall()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Heesch numbers of all polyforms of a given size")
+    parser.add_argument("size", type=int)
+    parser.add_argument("--marked", action="store_true", help="also try all edge markings up to symmetry")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--max-level", type=int, default=6)
+    parser.add_argument("--lattice", choices=sorted(grids), default=HEX.name)
+    parser.add_argument("--engine", choices=["sat", "search"], default="search")
+    parser.add_argument("--db", default="survey.db")
+    args = parser.parse_args()
+
+    if args.lattice == HEX.name:
+        shapes = free_polyhexes(args.size)
+    else:
+        shapes = free_polyforms(grids[args.lattice], args.size)
+    if args.marked:
+        shapes = (marked for shape in shapes for marked in markings(shape))
+    survey = Survey(args.db)
+    survey.run(shapes, args.workers, args.timeout, args.max_level, args.engine)
+    for row in survey.table(args.marked, args.lattice):
+        print(*row)
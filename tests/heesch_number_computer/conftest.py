@@ -0,0 +1,7 @@
+import os
+import sys
+
+# heesch_number_computer的模块之间用顶层导入(from hexshapes import ...),测试时把代码目录加入搜索路径
+CODE = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, "repo", "2024小美赛", "code",
+                    "heesch_number_computer-main", "heesch_number_computer-main", "code")
+sys.path.insert(0, os.path.abspath(CODE))
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+import lattice
+from checkpoint import Checkpoint
+from hexshapes import Hexagon, HShape
+
+
+""" heesch_computer 被中途杀掉后从检查点继续,结果与一次算完相同 """
+
+
+class Killed(Exception):
+    pass
+
+
+def hexapillar():
+    return HShape([Hexagon(0, 0, [1, 1, 0, -1, -1, 0]), Hexagon(2, 1, [1, 1, -1, -1, -1, 0])])
+
+
+def dying_checkpoint(records):  # 每个配置之后都写state.json,第records个配置写了一半时被杀掉
+    class Dying(Checkpoint):
+        count = 0
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **dict(kwargs, interval=0))
+
+        def record(self, i, placements):
+            if Dying.count == records:
+                self.next_file.write('[0, [1, 2')  # 没写完的一行,恢复时应被截掉
+                self.next_file.flush()
+                raise Killed
+            Dying.count += 1
+            super().record(i, placements)
+
+    return Dying
+
+
+def keys(configs):
+    return sorted(tuple(tuple(sorted(shape.to_data())) for corona in config for shape in corona) for config in configs)
+
+
+@pytest.mark.parametrize("records", [1, 40, 100])
+def test_resume(tmp_path, monkeypatch, records):
+    expected = hexapillar().heesch_computer(dynamic=True)
+    path = str(tmp_path / "checkpoint")
+    with monkeypatch.context() as patch:
+        patch.setattr(lattice, "Checkpoint", dying_checkpoint(records))
+        with pytest.raises(Killed):
+            hexapillar().heesch_computer(dynamic=True, checkpoint=path)
+    assert os.path.exists(os.path.join(path, "state.json"))
+    first = []
+
+    class Watching(Checkpoint):  # 记下恢复后扩展的第一个配置
+        def record(self, i, placements):
+            first.append(i)
+            super().record(i, placements)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(lattice, "Checkpoint", Watching)
+        resumed = hexapillar().heesch_computer(dynamic=True, checkpoint=path)
+    assert keys(resumed) == keys(expected)
+    assert first[0] > 0  # 没有从头重算
+
+
+def test_other_options(tmp_path):  # 同一个目录不能用来恢复另一组选项的计算
+    path = str(tmp_path / "checkpoint")
+    hexapillar().heesch_computer(dynamic=True, checkpoint=path, max_level=2)
+    with pytest.raises(ValueError):
+        hexapillar().heesch_computer(checkpoint=path, max_level=2)
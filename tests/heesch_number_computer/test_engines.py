@@ -0,0 +1,136 @@
+import pytest
+
+from hexshapes import Hexagon, HShape
+from heeschsat import heesch_number
+from frontier import Frontier
+from lattice import TRIANGLE, HeeschSearch, Polyform, TranspositionTable
+
+
+""" 各个引擎在Heesch数已知的形状上结果一致(形状见main.py) """
+
+
+def hexapillar():  # 2-hexapillar, Heesch数为4
+    return HShape([Hexagon(0, 0, [1, 1, 0, -1, -1, 0]), Hexagon(2, 1, [1, 1, -1, -1, -1, 0])])
+
+
+def three_hex_h2():  # 3hex H2, Heesch数为2
+    return HShape([Hexagon(0, 0, [0, 0, 0, -1, 0, -1]), Hexagon(2, 1, [0, 0, 1, 0, 0, 0]), Hexagon(1, -1)])
+
+
+def blocked():  # 单个六边形,相邻的两条边都是1: 第一个外部六边形没有合法摆放,Heesch数为0
+    return HShape([Hexagon(0, 0, [1, 1, 0, 0, 0, 0])])
+
+
+def heptiamond():  # 不能平铺平面的7-iamond, Heesch数为1
+    cells = [(0, 0, False), (0, 0, True), (0, 1, False), (0, 1, True), (1, 1, True), (1, 2, False), (2, 2, False)]
+    return Polyform(TRIANGLE, [(cell, (0, 0, 0)) for cell in cells])
+
+
+KNOWN = [(hexapillar, 4), (three_hex_h2, 2)]
+ENGINES = [
+    {},  # 固定顺序的搜索
+    {"dynamic": True},  # 最少候选优先
+    {"symmetry": True},  # 对称剪枝
+    {"engine": "dlx"},  # Dancing Links
+]
+
+
+@pytest.mark.parametrize("options", ENGINES, ids=["search", "dynamic", "symmetry", "dlx"])
+@pytest.mark.parametrize("make, heesch", KNOWN, ids=["hexapillar", "3hexH2"])
+def test_heesch_computer(make, heesch, options):
+    configs = make().heesch_computer(**options)
+    assert configs
+    assert all(len(config) == heesch for config in configs)
+
+
+@pytest.mark.parametrize("options", ENGINES, ids=["search", "dynamic", "symmetry", "dlx"])
+def test_no_corona(options):  # 每个引擎都不能跳过无法覆盖的外部格子
+    shape = blocked()
+    assert list(shape.corona_placements(shape.orientations(), **options)) == []
+    assert shape.heesch_computer(**options) == []
+
+
+@pytest.mark.parametrize("make, heesch", KNOWN, ids=["hexapillar", "3hexH2"])
+def test_sat(make, heesch):
+    number, patch = heesch_number(make())
+    assert number == heesch
+    assert len(patch) == heesch
+    assert heesch_number(blocked()) == (0, [])
+
+
+@pytest.mark.parametrize("make, heesch", KNOWN, ids=["hexapillar", "3hexH2"])
+def test_has_heesch_at_least(make, heesch):
+    found, witness = make().has_heesch_at_least(heesch, dynamic=True)
+    assert found and len(witness) == heesch
+    assert make().has_heesch_at_least(heesch + 1, dynamic=True) == (False, None)
+
+
+@pytest.mark.parametrize("options", ENGINES, ids=["search", "dynamic", "symmetry", "dlx"])
+def test_witness(options):  # 见证的每一层都覆盖了里面拼块的全部外部格子
+    shape = three_hex_h2()
+    found, witness = shape.has_heesch_at_least(2, **options)
+    assert found and len(witness) == 2
+    patch = shape
+    for corona in witness:
+        cells = {hex.origin for elem in corona for hex in elem.hexes}
+        assert {hex.origin for hex in patch.outside()} <= cells
+        patch = HShape(list(patch.hexes) + [hex for elem in corona for hex in elem.hexes])
+    assert blocked().has_heesch_at_least(1, **options) == (False, None)
+
+
+def test_workers():  # 进程池分块并行的结果与串行时完全相同,包括顺序
+    shape = three_hex_h2()
+
+    def data(configs):
+        return [[[elem.to_data() for elem in corona] for corona in config] for config in configs]
+
+    assert data(shape.heesch_computer(dynamic=True, workers=2)) == data(shape.heesch_computer(dynamic=True))
+    search = HeeschSearch(shape, dynamic=True)
+    frontier = Frontier(search.orientations)
+    for config in search.coronas([]):
+        frontier.append(-1, config)
+    serial = search.heesch_corona(frontier)
+    parallel = search.heesch_corona(frontier, workers=2, chunksize=1)  # 每块一个配置,窗口要滑动很多次
+    assert len(parallel) > 0
+    assert [parallel.levels(i) for i in range(len(parallel))] == [serial.levels(i) for i in range(len(serial))]
+
+
+def test_dlx_matches_dynamic():  # 第一层的冠状结构集合相同,只是顺序不同
+    shape = hexapillar()
+    orientations = shape.orientations()
+    dlx = [frozenset(config) for config in shape.corona_placements(orientations, engine="dlx")]
+    dynamic = [frozenset(config) for config in shape.corona_placements(orientations, dynamic=True)]
+    assert len(set(dynamic)) == len(dynamic)
+    assert sorted(dlx, key=sorted) == sorted(dynamic, key=sorted)
+
+
+@pytest.mark.parametrize("options", [{"dynamic": False}, {}, {"symmetry": True}, {"engine": "dlx"}, {"workers": 2}],
+                         ids=["search", "dynamic", "symmetry", "dlx", "workers"])
+def test_polyform(options):  # 其他网格上的形状与六边形共用同一套逐层计算
+    shape = heptiamond()
+    assert not shape.tiles()
+    configs = shape.heesch_computer(**options)
+    assert configs
+    assert all(len(config) == 1 for config in configs)
+    assert heesch_number(shape)[0] == 1
+
+
+class NoTable(TranspositionTable):  # 不去重的置换表
+    def dedupe(self, search, frontier):
+        return frontier
+
+
+def test_transposition_table():  # 中心形状有对称性,互为对称像的拼块只扩展一次,Heesch数不变
+    shape = heptiamond()
+    table = TranspositionTable()
+    configs = shape.heesch_computer(table=table)
+    plain = shape.heesch_computer(table=NoTable())
+    assert table.hits > 0
+    assert 0 < len(configs) < len(plain)
+    assert {len(config) for config in configs} == {len(config) for config in plain} == {1}
+
+
+def test_tiler():
+    shape = HShape([Hexagon(0, 0)])
+    assert shape.tiles()
+    assert shape.heesch_computer() is None
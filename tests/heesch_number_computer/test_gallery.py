@@ -0,0 +1,73 @@
+import os
+import struct
+import zlib
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("matplotlib")
+
+from gallery import gallery, rasterize  # noqa: E402 (需要numpy和matplotlib)
+from hexshapes import Hexagon, HShape  # noqa: E402
+from plotfile import MAGIC, PlotFile, PlotWriter  # noqa: E402
+
+
+""" gallery 画出的缩略图是合法的PNG,空的或损坏的结果文件被跳过 """
+
+
+def three_hex_h2():
+    return HShape([Hexagon(0, 0, [0, 0, 0, -1, 0, -1]), Hexagon(2, 1, [0, 0, 1, 0, 0, 0]), Hexagon(1, -1)])
+
+
+def write_result(path):  # 中心形状和它的第一层冠状结构
+    base = three_hex_h2()
+    corona = next(base.corona_iter(base.orientations()))
+    with PlotWriter(path, "corona", base) as writer:
+        writer.write_corona(1, corona)
+
+
+def read_png(path):  # 逐块解码PNG,检查每块的CRC,返回(宽, 高, (高, 宽, 3)的像素)
+    with open(path, "rb") as file:
+        data = file.read()
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    chunks, pos = [], 8
+    while pos < len(data):
+        length, = struct.unpack_from(">I", data, pos)
+        tag, body = data[pos + 4:pos + 8], data[pos + 8:pos + 8 + length]
+        crc, = struct.unpack_from(">I", data, pos + 8 + length)
+        assert crc == zlib.crc32(tag + body), tag
+        chunks.append((tag, body))
+        pos += 12 + length
+    assert [tag for tag, body in chunks] == [b"IHDR", b"IDAT", b"IEND"]
+    width, height, depth, color, compression, filter, interlace = struct.unpack(">IIBBBBB", chunks[0][1])
+    assert (depth, color, compression, filter, interlace) == (8, 2, 0, 0, 0)  # 8位RGB,不隔行
+    raw = np.frombuffer(zlib.decompress(chunks[1][1]), dtype=np.uint8).reshape(height, 1 + 3 * width)
+    assert not raw[:, 0].any()  # 每行都不做滤波
+    return width, height, raw[:, 1:].reshape(height, width, 3)
+
+
+def test_thumbnail(tmp_path):
+    source = tmp_path / "results"
+    source.mkdir()
+    write_result(str(source / "corona.bin"))
+    out = str(tmp_path / "gallery")
+    assert gallery(str(source), out, thumb=64, full=0) == []
+    width, height, pixels = read_png(os.path.join(out, "thumbs", "corona.png"))
+    assert max(width, height) == 64
+    with PlotFile(str(source / "corona.bin")) as data:
+        assert np.array_equal(pixels, rasterize(data, 64))
+    assert (pixels != 255).any() and (pixels == 255).any()  # 画了形状,也有背景
+
+
+def test_skips_bad_files(tmp_path):
+    source = tmp_path / "results"
+    source.mkdir()
+    write_result(str(source / "good.bin"))
+    (source / "empty.bin").write_bytes(b"")
+    (source / "corrupt.bin").write_bytes(b"not a heesch result file")
+    (source / "header.bin").write_bytes(MAGIC + struct.pack("<I", 100) + b'{"type": "cor')  # 文件头没写完
+    (source / "notes.txt").write_text("not a .bin file")
+    out = str(tmp_path / "gallery")
+    failed = gallery(str(source), out, thumb=32, full=0)
+    assert sorted(name for name, error in failed) == ["corrupt", "empty", "header"]
+    assert os.listdir(os.path.join(out, "thumbs")) == ["good.png"]
@@ -0,0 +1,53 @@
+import json
+
+from hexshapes import Hexagon, HShape
+from lattice import HeeschSearch, TranspositionTable
+from metrics import FIELDS, JsonLinesSink, Metrics
+
+
+""" heesch_computer(metrics=...) 每层的计数,以及JsonLinesSink写出的记录 """
+
+
+def three_hex_h2():  # 3hex H2, Heesch数为2
+    return HShape([Hexagon(0, 0, [0, 0, 0, -1, 0, -1]), Hexagon(2, 1, [0, 0, 1, 0, 0, 0]), Hexagon(1, -1)])
+
+
+def run(path, **options):  # 计算一次,返回(结果, 读回的记录)
+    table = TranspositionTable()
+    with JsonLinesSink(path) as sink:
+        configs = three_hex_h2().heesch_computer(dynamic=True, table=table, metrics=Metrics(sink), **options)
+    assert table.hits == 0  # 没有去掉的配置,下一层的输入就是这一层的输出
+    with open(path) as file:
+        return configs, [json.loads(line) for line in file]
+
+
+def test_levels(tmp_path):
+    configs, records = run(str(tmp_path / "metrics.jsonl"))
+    assert all(len(config) == 2 for config in configs)
+    levels = [record for record in records if record["event"] == "level"]
+    assert [record["level"] for record in levels] == [1, 2, 3]  # 第3层没有解,Heesch数为2
+
+    search = HeeschSearch(three_hex_h2(), dynamic=True)
+    first = list(search.coronas([]))
+    assert (levels[0]["configs"], levels[0]["next"]) == (1, len(first))
+    assert (levels[1]["configs"], levels[1]["next"]) == (len(first), len(configs))
+    assert (levels[2]["configs"], levels[2]["next"]) == (len(configs), 0)
+
+    for level in levels:  # 整层的汇总是这一层各格子计数的和
+        cells = [record for record in records if record["event"] == "cell" and record["level"] == level["level"]]
+        assert cells
+        for field in FIELDS[:5]:
+            assert level[field] == sum(record[field] for record in cells)
+        assert level["frontier"] >= level["configs"]  # 每个配置的搜索至少到达一个外部格子
+        for record in cells:  # 每个尝试的摆放恰好被接受或因为一个原因被拒绝
+            assert record["candidates"] == record["overlap"] + record["edge"] + record["accepted"]
+            assert record["seconds"] >= 0
+
+
+def test_workers(tmp_path):  # 其他进程中的计数合并后与串行时相同(时间除外)
+    def counts(records):
+        return [{key: value for key, value in record.items() if key not in ("seconds", "wall")} for record in records]
+
+    serial = run(str(tmp_path / "serial.jsonl"))[1]
+    parallel = run(str(tmp_path / "parallel.jsonl"), workers=2)[1]
+    assert counts(parallel) == counts(serial)
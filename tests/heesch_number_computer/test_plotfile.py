@@ -0,0 +1,80 @@
+import pytest
+
+from hexshapes import Hexagon, HShape
+from plotfile import RECORD, PlotFile, PlotWriter, convert_legacy
+
+
+""" PlotWriter写的结果文件由PlotFile原样读回 """
+
+
+def three_hex_h2():
+    return HShape([Hexagon(0, 0, [0, 0, 0, -1, 0, -1]), Hexagon(2, 1, [0, 0, 1, 0, 0, 0]), Hexagon(1, -1)])
+
+
+def exact(coronas):  # 形状的相等只在平移意义下,这里比较实际坐标
+    return [[sorted(shape.to_data()) for shape in corona] for corona in coronas]
+
+
+def test_round_trip(tmp_path):
+    base = three_hex_h2()
+    found, coronas = base.has_heesch_at_least(2, dynamic=True)
+    assert found
+    path = str(tmp_path / "plotlist.bin")
+    with PlotWriter(path, "heesch", base) as writer:
+        for level, corona in enumerate(coronas, 1):
+            writer.write_corona(level, corona)
+    with PlotFile(path) as result:
+        assert result.type == "heesch"
+        assert result.base.to_data() == base.to_data()
+        assert [shape.to_data() for shape in result.orientations] == [shape.to_data() for shape in base.orientations()]
+        assert len(result) == sum(len(corona) for corona in coronas)
+        assert exact(result.coronas()) == exact(coronas)
+
+
+def test_streaming(tmp_path):  # 每算完一层文件里就是目前最深的见证,计算结束后是结果中的第一个配置
+    base = three_hex_h2()
+    path = str(tmp_path / "plotlist.bin")
+    seen = []
+    with PlotWriter(path, "heesch", base) as writer:
+        def on_level(witness):
+            writer.rewrite(witness)
+            with PlotFile(path) as result:
+                seen.append(exact(result.coronas()))
+
+        configs = base.heesch_computer(dynamic=True, on_level=on_level)
+    assert [len(coronas) for coronas in seen] == [1, 2]
+    assert seen[-1] == exact(configs[0])
+    with PlotFile(path) as result:
+        assert exact(result.coronas()) == exact(configs[0])
+
+
+def test_partial_record(tmp_path):  # 写到一半的记录不算
+    base = three_hex_h2()
+    corona = next(base.corona_iter(base.orientations()))
+    path = str(tmp_path / "plotlist.bin")
+    with PlotWriter(path, "corona", base) as writer:
+        writer.write_corona(1, corona)
+        writer.file.write(RECORD.pack(2, 0, 0, 0)[:7])
+    with PlotFile(path) as result:
+        assert len(result) == len(corona)
+        assert exact(result.coronas()) == exact([corona])
+
+
+def test_not_a_result_file(tmp_path):
+    path = tmp_path / "plotlist.bin"
+    path.write_bytes(b"not a heesch file")
+    with pytest.raises(ValueError):
+        PlotFile(str(path))
+
+
+def test_convert_legacy(tmp_path):  # 旧的str(dict)格式
+    base = three_hex_h2()
+    corona = next(base.corona_iter(base.orientations()))
+    source = tmp_path / "plotlist.txt"
+    source.write_text(str({"type": "corona", "data": {"base": base.to_data(),
+                                                       "corona": [shape.to_data() for shape in corona]}}))
+    target = str(tmp_path / "plotlist.bin")
+    convert_legacy(str(source), target)
+    with PlotFile(target) as result:
+        assert result.type == "corona"
+        assert exact(result.coronas()) == exact([corona])
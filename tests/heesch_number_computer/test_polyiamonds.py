@@ -0,0 +1,54 @@
+import pytest
+
+from dlx import dlx_placements
+from lattice import TRIANGLE, corona_placements
+from shapes import Shape, Triangle
+
+
+""" shapes.Shape 的冠状结构与直接在 lattice 上搜索、以及用DLX得到的完全相同 """
+
+
+POLYIAMONDS = [  # (格子(x, y, 朝上), 第一层冠状结构的个数)
+    ([(0, 0, False), (0, 0, True), (0, 1, False), (1, 1, False)], 14),
+    ([(0, 0, False), (0, 0, True), (1, 0, False), (1, 0, True), (1, 1, False)], 72),
+    ([(0, 0, False), (0, 0, True), (1, 0, True), (1, 1, False), (1, 1, True), (2, 2, False)], 377),
+    ([(0, 0, False), (0, 0, True), (0, 1, False), (0, 1, True), (1, 1, True), (1, 2, False), (2, 2, False)], 2),
+    ([(0, 0, False), (0, 0, True), (1, 0, True), (1, 1, False), (1, 1, True), (1, 2, False), (2, 1, False)], 145),
+]
+
+
+def coronas(shape, **options):  # Shape 算出的冠状结构,每个是各形状的(格子, edgedata)集合组成的集合
+    found = shape.corona_maker(shape.orientations(), **options)
+    return [frozenset(frozenset((triangle.key, triangle.edgedata) for triangle in elem.triangles) for elem in corona)
+            for corona in found]
+
+
+def placed(tiles, configs):  # 摆放元组 -> 与 coronas() 相同的格式
+    return [frozenset(frozenset((TRIANGLE.translate(cell, dx, dy), edgedata) for cell, edgedata in tiles[index])
+                      for index, dx, dy in config)
+            for config in configs]
+
+
+def check(shape, count=None):
+    form = shape.polyform()
+    cells, outside = dict(form.cells), form.outside()
+    tiles = [orientation.cells for orientation in form.orientations()]
+    search = placed(tiles, corona_placements(TRIANGLE, cells, tiles, outside))
+    dlx = placed(tiles, dlx_placements(TRIANGLE, cells, tiles, outside))
+    own = coronas(shape)
+    assert len(set(own)) == len(own)  # 没有重复
+    if count is not None:
+        assert len(own) == count
+    assert set(own) == set(search) == set(dlx) == set(coronas(shape, engine="dlx"))
+    assert len(own) == len(search) == len(dlx)
+
+
+@pytest.mark.parametrize("cells, count", POLYIAMONDS, ids=["4", "5", "6", "7-heesch1", "7"])
+def test_unmarked(cells, count):
+    check(Shape([Triangle(x, y, up) for x, y, up in cells]), count)
+
+
+def test_marked():  # 边类型跟着 Triangle.turn60 和 flip 走,与 lattice 的对称变换一致
+    check(Shape([Triangle(0, 0, True, [0, -1, 0]), Triangle(0, 0, False, [0, 0, 1])]), 44)
+    check(Shape([Triangle(0, 0, True, [0, -1, 1]), Triangle(0, 0, False, [0, 0, 0])]), 52)
+    check(Shape([Triangle(0, 0, True, [0, 0, 1]), Triangle(0, 0, False, [0, -1, 1]), Triangle(1, 1, False, [1, -1, 0])]), 2)
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from lattice import HEX, SQUARE, TRIANGLE
+from survey import Survey, canonical_key, fixed_polyforms, free_polyforms, free_polyhexes, heesch_job, markings
+
+
+""" Redelmeier枚举的个数与OEIS一致,以及一次小的Survey """
+
+
+FREE = [
+    (HEX, [1, 1, 3, 7, 22, 82]),  # A000228
+    (TRIANGLE, [1, 1, 1, 3, 4, 12, 24, 66]),  # A000577
+    (SQUARE, [1, 1, 2, 5, 12, 35, 108]),  # A000105
+]
+FIXED = [
+    (HEX, [1, 3, 11, 44, 186, 814]),  # A001207
+    (TRIANGLE, [2, 3, 6, 14, 36, 94]),  # A001420
+    (SQUARE, [1, 2, 6, 19, 63, 216]),  # A001168
+]
+
+
+@pytest.mark.parametrize("grid, counts", FREE, ids=["hex", "triangle", "square"])
+def test_free_counts(grid, counts):
+    assert [sum(1 for _ in free_polyforms(grid, n)) for n in range(1, len(counts) + 1)] == counts
+
+
+@pytest.mark.parametrize("grid, counts", FIXED, ids=["hex", "triangle", "square"])
+def test_fixed_counts(grid, counts):
+    assert [sum(1 for _ in fixed_polyforms(grid, n)) for n in range(1, len(counts) + 1)] == counts
+
+
+def test_free_polyhexes_are_distinct():
+    keys = [canonical_key(shape) for shape in free_polyhexes(5)]
+    assert len(set(keys)) == len(keys) == 22
+
+
+def test_markings_up_to_symmetry():  # 单个六边形的6条边标上-1, 0, 1,在12个对称变换下有92类(项链计数)
+    shape = next(free_polyhexes(1))
+    assert sum(1 for _ in markings(shape)) == 92
+
+
+def test_survey(tmp_path):  # 四格骨牌都能平铺;再运行一次时已经算过的形状被跳过
+    path = str(tmp_path / "survey.db")
+    survey = Survey(path)
+    survey.run(free_polyforms(SQUARE, 4), timeout=0)
+    assert survey.table(lattice=SQUARE.name) == [(4, None, "tiles", 5)]
+    survey.run(free_polyforms(SQUARE, 4), timeout=0)
+    assert survey.db.execute("SELECT COUNT(*) FROM results").fetchone() == (5,)
+
+
+@pytest.mark.parametrize("engine", ["search", "sat"])
+def test_timeout(engine):  # 超时由搜索检查截止时间,不用信号;已经算完的层数是下界
+    data = [[0, 0, [1, 1, 0, -1, -1, 0]], [2, 1, [1, 1, -1, -1, -1, 0]]]  # 2-hexapillar, Heesch数为4
+    key, heesch, status, witness, seconds = heesch_job(("key", HEX.name, data, engine, 6, 0.01))
+    assert status == "timeout"
+    assert heesch < 4 and len(json.loads(witness)) == heesch
+    assert seconds < 10
+    key, heesch, status, witness, seconds = heesch_job(("key", HEX.name, data, "search", 3, 0))
+    assert (heesch, status, len(json.loads(witness))) == (3, "max_level", 3)
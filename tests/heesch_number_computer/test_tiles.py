@@ -0,0 +1,68 @@
+import pytest
+
+from hexshapes import Hexagon, HShape
+from lattice import SQUARE, TRIANGLE, Polyform
+from survey import free_polyforms
+
+
+""" tiles() 在三种网格上的判定,以及 heesch_computer 用它提前返回None """
+
+
+def blank(grid, cells):  # 没有边类型标记的多格形
+    return Polyform(grid, [(cell, (0,) * len(grid.vertices(cell))) for cell in cells])
+
+
+def ring():  # 围着一个空格子的6个六边形,中间的洞填不上
+    return HShape([Hexagon(x, y) for x, y in [(2, 1), (1, 2), (-1, 1), (-2, -1), (-1, -2), (1, -1)]])
+
+
+def three_hex_h2():  # 3hex H2, Heesch数为2
+    return HShape([Hexagon(0, 0, [0, 0, 0, -1, 0, -1]), Hexagon(2, 1, [0, 0, 1, 0, 0, 0]), Hexagon(1, -1)])
+
+
+def holey_heptomino():  # 3x3去掉中心和一角,中心是洞
+    return blank(SQUARE, [(0, 0), (0, 1), (0, 2), (1, 0), (1, 2), (2, 0), (2, 1)])
+
+
+def heptiamond():  # 不能平铺平面的7-iamond, Heesch数为1
+    return blank(TRIANGLE, [(0, 0, False), (0, 0, True), (0, 1, False), (0, 1, True), (1, 1, True), (1, 2, False),
+                            (2, 2, False)])
+
+
+def straight_tromino():
+    return blank(SQUARE, [(0, 0), (1, 0), (2, 0)])
+
+
+def test_polyhex():
+    assert HShape([Hexagon(0, 0), Hexagon(2, 1)]).tiles()
+    assert not ring().tiles()
+    assert not three_hex_h2().tiles()
+
+
+@pytest.mark.parametrize("grid, n, count", [(SQUARE, 5, 12), (SQUARE, 6, 35), (TRIANGLE, 5, 4), (TRIANGLE, 6, 12)],
+                         ids=["pentominoes", "hexominoes", "pentiamonds", "hexiamonds"])
+def test_small_polyforms(grid, n, count):  # 这些大小的多格形都能平铺平面,判定都能认出来
+    shapes = list(free_polyforms(grid, n))
+    assert len(shapes) == count
+    assert all(shape.tiles() for shape in shapes)
+
+
+def test_polyomino():
+    assert straight_tromino().tiles()
+    assert not holey_heptomino().tiles()
+
+
+def test_polyiamond():
+    assert blank(TRIANGLE, [(0, 0, False), (0, 0, True)]).tiles()  # 菱形
+    assert not heptiamond().tiles()
+
+
+@pytest.mark.parametrize("make, heesch", [(ring, 0), (three_hex_h2, 2), (holey_heptomino, 0), (heptiamond, 1),
+                                          (straight_tromino, None)],
+                         ids=["ring", "3hexH2", "holey-heptomino", "heptiamond", "tromino"])
+def test_heesch_computer(make, heesch):  # check_tiling=True时恰好在 tiles() 为True时返回None
+    shape = make()
+    configs = shape.heesch_computer(max_level=3, check_tiling=True)
+    assert (configs is None) == shape.tiles() == (heesch is None)
+    if heesch is not None:
+        assert {len(config) for config in configs} == ({heesch} if heesch else set())